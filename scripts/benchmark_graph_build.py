@@ -0,0 +1,76 @@
+"""对比不同图构建引擎在合成菜谱规模下的耗时。
+
+语料来自 :func:`synthetic_corpus.benchmark_recipes`，候选对数量随规模近似线性
+增长，默认的 1k/10k/50k 都能在阈值 0.2 下完成。
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from synthetic_corpus import benchmark_recipes
+
+from graph_rag_recipes.graph_builder import RecipeGraphBuilder
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="图构建耗时基准")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1000, 10000, 50000],
+        help="合成菜谱数量，默认 1k/10k/50k",
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="相似度阈值，默认与配置一致"
+    )
+    parser.add_argument(
+        "--block-size", type=int, default=1024, help="稀疏引擎每个行块的菜谱数量"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="分片打分使用的进程数，默认单进程"
+    )
+    parser.add_argument(
+        "--pairwise-max",
+        type=int,
+        default=2000,
+        help="逐对枚举只在不超过该规模时运行并校验结果一致性",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    print("规模\t引擎\t耗时(s)\t边数")
+    for size in args.sizes:
+        recipes = benchmark_recipes(size)
+        engines = ["indexed", "sparse"]
+        if size <= args.pairwise_max:
+            engines.append("pairwise")
+        # 以最后一个引擎（逐对枚举或稀疏引擎）作为一致性校验的基准
+        graphs = {}
+        for engine in engines:
+            builder = RecipeGraphBuilder(
+                args.threshold,
+                engine=engine,
+                block_size=args.block_size,
+                workers=args.workers,
+            )
+            start = time.perf_counter()
+            graphs[engine] = builder.build_graph(recipes)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{size}\t{engine}\t{elapsed:.2f}\t{graphs[engine].number_of_edges()}"
+            )
+
+        expected = list(graphs[engines[-1]].edges(data="weight"))
+        for engine in engines[:-1]:
+            actual = list(graphs[engine].edges(data="weight"))
+            status = "一致" if expected == actual else "不一致"
+            print(f"{size}\t校验({engine})\t{status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""导入耗时基准：基于 ``python -X importtime`` 检查包与命令行的冷启动预算。
+
+每个目标在全新的解释器中运行多次取中位数；超出预算或在启动阶段导入了重量级
+依赖（numpy、networkx、torch、openai 等应推迟到首次使用）时以非零状态退出，
+可直接用于 CI。
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+# 这些依赖只应在真正用到时导入：建图与检索数组、模型编码、LLM 请求、下载数据、
+# 稀疏引擎、精确计数
+DEFERRED_MODULES = (
+    "numpy",
+    "networkx",
+    "torch",
+    "sentence_transformers",
+    "openai",
+    "httpx",
+    "requests",
+    "scipy",
+    "tiktoken",
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="导入耗时基准")
+    parser.add_argument("--repeat", type=int, default=5, help="每个目标的运行次数")
+    parser.add_argument("--top", type=int, default=8, help="列出耗时最多的模块数")
+    parser.add_argument(
+        "--package-budget", type=float, default=50.0, help="import 包的预算（毫秒）"
+    )
+    parser.add_argument(
+        "--pipeline-budget",
+        type=float,
+        default=200.0,
+        help="import pipeline 模块的预算（毫秒）",
+    )
+    parser.add_argument(
+        "--cli-budget",
+        type=float,
+        default=400.0,
+        help="run_pipeline.py --help 的端到端预算（毫秒，含解释器启动）",
+    )
+    return parser.parse_args()
+
+
+def child_env() -> dict[str, str]:
+    env = dict(os.environ)
+    paths = [str(ROOT / "src"), env.get("PYTHONPATH", "")]
+    env["PYTHONPATH"] = os.pathsep.join(path for path in paths if path)
+    return env
+
+
+def import_profile(module: str) -> list[tuple[str, int, int]]:
+    """返回 (模块名, 嵌套深度, 累计耗时 µs)，顺序与 importtime 输出一致。"""
+
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=child_env(),
+        check=True,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        if not self_us.strip().isdigit():
+            continue  # 表头
+        # 名称前固定一个空格，之后每层嵌套缩进两个空格
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(cumulative_us)))
+    return rows
+
+
+def measure_import(
+    module: str, repeat: int
+) -> tuple[float, list[tuple[str, int]], list[str]]:
+    totals = []
+    profile: list[tuple[str, int, int]] = []
+    for _ in range(repeat):
+        profile = import_profile(module)
+        totals.append(next(cum for name, _, cum in profile if name == module) / 1e3)
+    # 目标模块的直接依赖：位于目标条目之前、上一个顶层条目之后的第一层条目
+    end = next(idx for idx, (name, depth, _) in enumerate(profile) if name == module)
+    start = end
+    while start > 0 and profile[start - 1][1] > 0:
+        start -= 1
+    children = [(name, cum) for name, depth, cum in profile[start:end] if depth == 1]
+    children.sort(key=lambda item: item[1], reverse=True)
+    loaded = {name.split(".")[0] for name, _, _ in profile}
+    deferred = [name for name in DEFERRED_MODULES if name in loaded]
+    return statistics.median(totals), children, deferred
+
+
+def measure_cli(repeat: int) -> float:
+    elapsed = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, str(ROOT / "scripts" / "run_pipeline.py"), "--help"],
+            capture_output=True,
+            env=child_env(),
+            check=True,
+        )
+        elapsed.append((time.perf_counter() - start) * 1e3)
+    return statistics.median(elapsed)
+
+
+def main() -> None:
+    args = parse_args()
+    failures: list[str] = []
+    targets = (
+        ("graph_rag_recipes", args.package_budget),
+        ("graph_rag_recipes.pipeline", args.pipeline_budget),
+    )
+    for module, budget in targets:
+        total_ms, children, deferred = measure_import(module, args.repeat)
+        status = "通过" if total_ms <= budget else "超出预算"
+        print(f"import {module}\t{total_ms:.1f} ms / 预算 {budget:.0f} ms\t{status}")
+        for name, cumulative in children[: args.top]:
+            print(f"    {cumulative / 1e3:8.1f} ms\t{name}")
+        if total_ms > budget:
+            failures.append(f"{module} 导入 {total_ms:.1f} ms")
+        if deferred:
+            print(f"    启动阶段导入了应推迟的依赖: {', '.join(deferred)}")
+            failures.append(f"{module} 提前导入 {', '.join(deferred)}")
+
+    cli_ms = measure_cli(args.repeat)
+    status = "通过" if cli_ms <= args.cli_budget else "超出预算"
+    print(
+        f"run_pipeline.py --help\t{cli_ms:.1f} ms / 预算 {args.cli_budget:.0f} ms\t{status}"
+    )
+    if cli_ms > args.cli_budget:
+        failures.append(f"CLI --help {cli_ms:.1f} ms")
+
+    if failures:
+        print("未通过: " + "；".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
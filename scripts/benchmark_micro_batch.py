@@ -0,0 +1,105 @@
+"""对比并发查询下逐条编码与微批合并编码的吞吐与延迟。
+
+真实 SentenceTransformer 在 CPU 上每次调用都有固定开销且会占满所有核心，
+这里用持锁的桩编码器模拟：每次 ``encode`` 独占编码器，耗时为固定开销加
+每条文本的边际成本。
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Sequence
+
+import numpy as np
+from synthetic_corpus import StubEncoder, synthetic_recipes
+
+from graph_rag_recipes.embeddings import RecipeEmbeddingIndex
+
+
+class SerializedEncoder(StubEncoder):
+    """一次只处理一个批次的桩编码器，记录调用次数。"""
+
+    def __init__(self, dim: int, overhead_ms: float, per_text_ms: float) -> None:
+        super().__init__(dim)
+        self.overhead = overhead_ms / 1e3
+        self.per_text = per_text_ms / 1e3
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def encode(self, texts: Sequence[str], **kwargs: object) -> np.ndarray:
+        with self._lock:
+            self.calls += 1
+            time.sleep(self.overhead + self.per_text * len(texts))
+            return super().encode(texts, **kwargs)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="向量查询微批调度基准")
+    parser.add_argument("--size", type=int, default=5000, help="合成菜谱数量")
+    parser.add_argument("--queries", type=int, default=400, help="查询条数")
+    parser.add_argument("--threads", type=int, default=16, help="并发线程数")
+    parser.add_argument("--dim", type=int, default=384, help="桩编码器的向量维度")
+    parser.add_argument(
+        "--overhead-ms", type=float, default=4.0, help="每次 encode 的固定开销"
+    )
+    parser.add_argument(
+        "--per-text-ms", type=float, default=0.2, help="每条文本的边际编码成本"
+    )
+    parser.add_argument(
+        "--windows",
+        type=float,
+        nargs="+",
+        default=[0.0, 1.0, 2.0, 5.0],
+        help="合并窗口（毫秒），0 表示逐条编码",
+    )
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    recipes = synthetic_recipes(args.size)
+    # 查询文本互不相同，避免查询向量缓存掩盖编码开销
+    queries = [
+        f"{' '.join(recipes[idx % len(recipes)].ingredients[:2])} {idx}"
+        for idx in range(args.queries)
+    ]
+    print("窗口(ms)\t总耗时(s)\tQPS\tp50(ms)\tp99(ms)\tencode 次数\t平均批量")
+    for window in args.windows:
+        encoder = SerializedEncoder(args.dim, args.overhead_ms, args.per_text_ms)
+        index = RecipeEmbeddingIndex(
+            "benchmark",
+            encoder=encoder,
+            query_cache_size=0,
+            batch_window_ms=window,
+            max_batch_size=args.max_batch_size,
+        )
+        index.build(recipes)
+        encoder.calls = 0
+
+        def timed_query(text: str) -> float:
+            start = time.perf_counter()
+            index.query(text)
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as executor:
+            latencies = list(executor.map(timed_query, queries))
+        elapsed = time.perf_counter() - start
+        stats = index.batch_stats()
+        mean_batch = stats.mean_batch_size if stats else 1.0
+        print(
+            f"{window:g}\t{elapsed:.3f}\t{len(queries) / elapsed:.0f}\t"
+            f"{np.percentile(latencies, 50) * 1e3:.1f}\t"
+            f"{np.percentile(latencies, 99) * 1e3:.1f}\t"
+            f"{encoder.calls}\t{mean_batch:.1f}"
+        )
+        if stats:
+            print(f"\t批次直方图 {stats.histogram}")
+
+
+if __name__ == "__main__":
+    main()
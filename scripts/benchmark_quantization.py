@@ -0,0 +1,102 @@
+"""对比 float32 / int8 向量存储的内存占用、查询耗时与 top-k 一致率。"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from synthetic_corpus import synthetic_embeddings
+
+from graph_rag_recipes.quantization import QuantizedMatrix
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="向量量化基准")
+    parser.add_argument("--size", type=int, default=200000, help="向量条数")
+    parser.add_argument(
+        "--dim", type=int, default=384, help="向量维度，默认与 MiniLM 一致"
+    )
+    parser.add_argument("--queries", type=int, default=64, help="查询条数")
+    parser.add_argument(
+        "--batch", type=int, default=1, help="每次调用包含的查询条数，默认逐条查询"
+    )
+    parser.add_argument("--top-k", type=int, default=10, help="每次检索的条数")
+    parser.add_argument(
+        "--rescore-factors",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8],
+        help="精排候选为 top_k 的多少倍",
+    )
+    return parser.parse_args()
+
+
+def batches(queries: np.ndarray, size: int) -> list[np.ndarray]:
+    return [queries[start : start + size] for start in range(0, len(queries), size)]
+
+
+def exact_top_k(
+    matrix: np.ndarray, queries: np.ndarray, top_k: int
+) -> list[np.ndarray]:
+    scores = queries @ matrix.T
+    top = np.argpartition(scores, -top_k, axis=1)[:, -top_k:]
+    return list(top)
+
+
+def main() -> None:
+    args = parse_args()
+    vectors = synthetic_embeddings(args.size, args.dim)
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.choice(args.size, size=args.queries, replace=False)]
+    queries = queries + 0.3 * rng.standard_normal(queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 与线上一致：全精度向量以 .npy 内存映射提供，仅在精排时按需读取
+        path = Path(tmp_dir) / "vectors.npy"
+        np.save(path, vectors)
+        mapped = np.load(path, mmap_mode="r")
+        del vectors
+
+        start = time.perf_counter()
+        expected = [
+            top
+            for batch in batches(queries, args.batch)
+            for top in exact_top_k(mapped, batch, args.top_k)
+        ]
+        exact_ms = (time.perf_counter() - start) / args.queries * 1e3
+        resident = mapped.size * mapped.itemsize
+        print(f"向量 {args.size}×{args.dim}，每次调用 {args.batch} 条查询")
+        print("存储\t精排倍数\t常驻(MiB)\t单次(ms)\t一致率")
+        print(f"float32\t-\t{resident / 1024**2:.1f}\t{exact_ms:.2f}\t1.000")
+
+        no_excludes = [()] * args.batch
+        for mode in QuantizedMatrix.MODES:
+            quantized = QuantizedMatrix.from_matrix(mapped, mode)
+            for factor in args.rescore_factors:
+                start = time.perf_counter()
+                hits = [
+                    hit
+                    for batch in batches(queries, args.batch)
+                    for hit in quantized.search_batch(
+                        batch, args.top_k, no_excludes[: len(batch)], mapped, factor
+                    )
+                ]
+                elapsed_ms = (time.perf_counter() - start) / args.queries * 1e3
+                agreement = sum(
+                    len(set(rows.tolist()) & set(truth.tolist()))
+                    for (rows, _), truth in zip(hits, expected)
+                ) / (args.queries * args.top_k)
+                print(
+                    f"{mode}\t{factor}\t{quantized.nbytes / 1024**2:.1f}\t"
+                    f"{elapsed_ms:.2f}\t{agreement:.3f}"
+                )
+            del quantized
+        del mapped
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""对比 networkx 邻接、CSR 邻接逐条与批量 top-k 邻居检索的耗时。"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from synthetic_corpus import synthetic_recipes
+
+from graph_rag_recipes.csr_graph import CSRGraph
+from graph_rag_recipes.graph_builder import RecipeGraphBuilder
+from graph_rag_recipes.recipe_store import RecipeStore
+from graph_rag_recipes.retrieval import RecipeRetriever
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="图检索耗时基准")
+    parser.add_argument("--size", type=int, default=5000, help="合成菜谱数量")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="相似度阈值，默认与配置一致"
+    )
+    parser.add_argument("--top-k", type=int, default=10, help="每次检索的邻居数量")
+    parser.add_argument(
+        "--batch", type=int, default=64, help="批量检索时每次调用的菜谱数量"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    store = RecipeStore(synthetic_recipes(args.size))
+    graph = RecipeGraphBuilder(args.threshold).build_graph(store)
+    start = time.perf_counter()
+    csr = CSRGraph.from_networkx(graph)
+    print(
+        f"菜谱 {len(store)}，边 {graph.number_of_edges()}，"
+        f"CSR 转换 {time.perf_counter() - start:.2f}s"
+    )
+
+    retriever = RecipeRetriever(args.top_k, store)
+    recipe_ids = [recipe.recipe_id for recipe in store]
+    results = {}
+    print("后端\t总耗时(s)\t单次(us)")
+    for name, backend in (("networkx", graph), ("csr", csr)):
+        start = time.perf_counter()
+        results[name] = [
+            [view.row for view in retriever.find_similar_recipes(backend, recipe_id)]
+            for recipe_id in recipe_ids
+        ]
+        elapsed = time.perf_counter() - start
+        print(f"{name}\t{elapsed:.3f}\t{elapsed / len(recipe_ids) * 1e6:.1f}")
+
+    start = time.perf_counter()
+    results["csr-batch"] = [
+        [view.row for view in neighbors]
+        for batch_start in range(0, len(recipe_ids), args.batch)
+        for neighbors in retriever.find_similar_recipes_batch(
+            csr, recipe_ids[batch_start : batch_start + args.batch]
+        )
+    ]
+    elapsed = time.perf_counter() - start
+    print(f"csr-batch\t{elapsed:.3f}\t{elapsed / len(recipe_ids) * 1e6:.1f}")
+    consistent = results["networkx"] == results["csr"] == results["csr-batch"]
+    status = "一致" if consistent else "不一致"
+    print(f"校验\t{status}")
+
+
+if __name__ == "__main__":
+    main()
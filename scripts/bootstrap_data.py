@@ -5,6 +5,7 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 
+from graph_rag_recipes.config import ProjectConfig
 from graph_rag_recipes.data_ingest import HowToCookIngestor
 
 
@@ -16,6 +17,11 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--force-processed", action="store_true", help="重新生成 processed JSON"
     )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="按文件清单增量刷新 processed JSON，只重新解析新增或修改的菜谱",
+    )
     parser.add_argument(
         "--limit",
         type=int,
@@ -33,6 +39,12 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="跳过远程下载，仅使用现有仓库/示例数据",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="并行解析 Markdown 的进程数，默认 1（串行）",
+    )
     parser.add_argument(
         "--show",
         type=int,
@@ -44,7 +56,7 @@ def parse_args() -> argparse.Namespace:
 
 def main() -> None:
     args = parse_args()
-    ingestor = HowToCookIngestor()
+    ingestor = HowToCookIngestor(ProjectConfig(ingest_workers=args.workers))
 
     repo_path: Path | str = "跳过下载（使用现有缓存或示例）"
     if not args.skip_download:
@@ -55,6 +67,10 @@ def main() -> None:
         repo_path = ingestor.repo_dir
 
     limit = None if args.limit == 0 else args.limit
+    changes = None
+    if args.refresh and not args.force_processed:
+        # prepare_local_copy 已完成 git pull，这里无需再次同步仓库
+        changes = ingestor.refresh_processed_dataset(limit=limit, ensure_dataset=False)
     processed_path = ingestor.build_processed_dataset(
         limit=limit,
         force=args.force_processed,
@@ -67,6 +83,8 @@ def main() -> None:
     print("=== HowToCook 数据准备完成 ===")
     print(f"数据源目录: {repo_path}")
     print(f"结构化数据: {processed_path}")
+    if changes is not None:
+        print(f"增量刷新: {changes.summary()}")
     print(f"示例展示（最多 {args.show} 条）:")
     for record in preview_records:
         ingredient_str = ", ".join(record.ingredients[:5])
@@ -3,10 +3,15 @@
 from __future__ import annotations
 
 import argparse
+import sys
+import time
+from typing import TYPE_CHECKING
 
 from graph_rag_recipes.config import ProjectConfig
-from graph_rag_recipes.pipeline import GraphRAGPipeline
-from graph_rag_recipes.ui_components import format_cli_block
+from graph_rag_recipes.ui_components import format_cli_block, format_cli_header
+
+if TYPE_CHECKING:
+    from graph_rag_recipes.pipeline import GraphRAGPipeline
 
 
 def parse_args() -> argparse.Namespace:
@@ -17,14 +22,109 @@ def parse_args() -> argparse.Namespace:
         default="U123",
         help="用户 ID (如 U123) 或喜欢的菜名",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="先输出检索结果，再流式输出推荐理由并报告首字耗时",
+    )
+    parser.add_argument(
+        "--server",
+        metavar="URL",
+        default=None,
+        help="连接已启动的推荐服务（如 http://127.0.0.1:8765），不在本地加载图",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="在 stderr 输出各阶段耗时明细（含首次加载图）",
+    )
+    args = parser.parse_args()
+    if args.server and args.stream:
+        parser.error("--server 暂不支持 --stream")
+    if args.server and args.profile:
+        parser.error("--profile 只能用于本地运行，服务端请使用 /stats")
+    return args
+
+
+def report_prompt(pipeline: GraphRAGPipeline) -> None:
+    stats = pipeline.llm_generator.last_prompt_stats
+    if stats is None:
+        return
+    budget = stats.budget or "不限"
+    print(
+        f"[prompt] {stats.tokens} tokens / 预算 {budget}，细节 {stats.detail}，"
+        f"候选 {stats.candidates} 条（舍弃 {stats.dropped_candidates} 条），"
+        f"去重共同食材 {stats.shared_ingredients} 项",
+        file=sys.stderr,
+    )
+
+
+def report_profile(pipeline: GraphRAGPipeline) -> None:
+    trace = pipeline.tracer.last_trace
+    if trace is not None:
+        print(f"[profile]\n{trace.format()}", file=sys.stderr)
+
+
+def run_streaming(pipeline: GraphRAGPipeline, query: str) -> None:
+    start = time.perf_counter()
+    retrieval = pipeline.retrieve(query)
+    retrieved_at = time.perf_counter()
+    print(format_cli_header(retrieval.reference_recipe, retrieval.similar_recipes))
+    print("推荐理由: ", end="", flush=True)
+
+    first_output_at: float | None = None
+    for delta in pipeline.generate_stream(retrieval):
+        if first_output_at is None:
+            first_output_at = time.perf_counter()
+        print(delta, end="", flush=True)
+    finished_at = time.perf_counter()
+    print()
+
+    first_output_at = first_output_at or finished_at
+    print(
+        f"[耗时] 检索 {retrieved_at - start:.2f}s，"
+        f"首字 {first_output_at - start:.2f}s，"
+        f"完成 {finished_at - start:.2f}s",
+        file=sys.stderr,
+    )
+    report_prompt(pipeline)
+
+
+def run_remote(server: str, query: str) -> None:
+    from graph_rag_recipes.service import RecommendationClient, ServiceError
+
+    client = RecommendationClient(server)
+    start = time.perf_counter()
+    try:
+        result = client.recommend(query)
+    except ServiceError as exc:
+        print(f"[服务] {exc}", file=sys.stderr)
+        sys.exit(1)
+    elapsed_ms = (time.perf_counter() - start) * 1e3
+    print(format_cli_block(result))
+    print(
+        f"[服务] 服务端 {client.last_latency_ms or 0:.1f}ms，往返 {elapsed_ms:.1f}ms",
+        file=sys.stderr,
+    )
 
 
 def main() -> None:
     args = parse_args()
-    pipeline = GraphRAGPipeline(ProjectConfig())
-    result = pipeline.recommend(args.query)
-    print(format_cli_block(result))
+    if args.server:
+        run_remote(args.server, args.query)
+        return
+    # 管线依赖 numpy/networkx 等较重的模块，解析完参数再导入，--help 可立即返回
+    from graph_rag_recipes.pipeline import GraphRAGPipeline
+
+    pipeline = GraphRAGPipeline(ProjectConfig(tracing_enabled=args.profile))
+    if args.stream:
+        run_streaming(pipeline, args.query)
+    else:
+        result = pipeline.recommend(args.query)
+        print(format_cli_block(result))
+        report_prompt(pipeline)
+    if args.profile:
+        report_profile(pipeline)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,69 @@
+"""启动常驻推荐服务：图与向量索引只加载一次，之后通过 HTTP JSON 接口提供推荐。"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+
+from graph_rag_recipes.config import ProjectConfig
+
+
+def parse_args() -> argparse.Namespace:
+    defaults = ProjectConfig()
+    parser = argparse.ArgumentParser(description="启动 GraphRAG 推荐服务")
+    parser.add_argument("--host", default=defaults.service_host, help="监听地址")
+    parser.add_argument(
+        "--port", type=int, default=defaults.service_port, help="监听端口"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=defaults.service_workers,
+        help="处理请求的线程数，即并发上限",
+    )
+    parser.add_argument(
+        "--batch-window-ms",
+        type=float,
+        default=2.0,
+        help="并发查询的向量编码合并窗口（毫秒），0 表示逐条编码",
+    )
+    parser.add_argument(
+        "--max-batch-size",
+        type=int,
+        default=defaults.embedding_max_batch_size,
+        help="单次合并编码的最大查询条数",
+    )
+    parser.add_argument(
+        "--slow-ms",
+        type=float,
+        default=0.0,
+        help="慢请求阈值（毫秒），超过时记录分阶段明细；大于 0 时开启计时",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="开启分阶段计时，各阶段延迟直方图见 /stats",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    from graph_rag_recipes.service import serve
+
+    serve(
+        ProjectConfig(
+            service_host=args.host,
+            service_port=args.port,
+            service_workers=args.workers,
+            embedding_batch_window_ms=args.batch_window_ms,
+            embedding_max_batch_size=args.max_batch_size,
+            tracing_enabled=args.trace,
+            slow_request_ms=args.slow_ms,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,16 +2,41 @@
 
 from __future__ import annotations
 
-from .config import ProjectConfig
-from .pipeline import GraphRAGPipeline
-from .ui_components import format_cli_block
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .config import ProjectConfig
+    from .pipeline import GraphRAGPipeline
+    from .ui_components import format_cli_block
+
+# 公开名称按需从子模块导入：``import graph_rag_recipes`` 不会连带加载 numpy、
+# networkx 等依赖，命令行在解析参数前即可快速响应
+_LAZY_EXPORTS = {
+    "GraphRAGPipeline": ".pipeline",
+    "ProjectConfig": ".config",
+    "format_cli_block": ".ui_components",
+}
 
 __all__ = ["GraphRAGPipeline", "ProjectConfig", "format_cli_block", "main"]
 
 
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
 def main() -> None:
     """允许通过 `uv run graph-rag-recipes` 快速演示推荐流程。"""
 
+    from .config import ProjectConfig
+    from .pipeline import GraphRAGPipeline
+    from .ui_components import format_cli_block
+
     pipeline = GraphRAGPipeline(ProjectConfig())
     result = pipeline.run_demo()
     print(format_cli_block(result))
@@ -0,0 +1,238 @@
+"""纯 NumPy 实现的 IVF 近似最近邻索引，用于大规模菜谱向量检索。"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+LOGGER = logging.getLogger(__name__)
+
+
+class IVFIndex:
+    """倒排文件（IVF-Flat）索引。
+
+    训练阶段用球面 k-means 将单位向量划分为 ``n_lists`` 个簇；查询时先与所有簇心
+    比较，只在得分最高的 ``n_probe`` 个簇内做精确内积。``n_probe`` 越大召回越高、
+    延迟越大，等于 ``n_lists`` 时退化为精确检索。索引只保存簇心与行号分组，向量本身
+    仍引用传入的矩阵（可以是内存映射），因此持久化文件很小。
+    """
+
+    FORMAT_VERSION = 1
+    # 每个簇参与训练的平均样本数，训练代价与语料规模解耦
+    SAMPLES_PER_LIST = 64
+    # 分配阶段每批处理的向量行数，限制中间得分矩阵的内存
+    ASSIGN_BATCH = 16384
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        centroids: np.ndarray,
+        offsets: np.ndarray,
+        rows: np.ndarray,
+        n_probe: int = 8,
+    ) -> None:
+        if len(offsets) != len(centroids) + 1 or int(offsets[-1]) != len(rows):
+            raise ValueError("IVF 簇偏移与行号数组不一致")
+        self.vectors = vectors
+        self.centroids = centroids
+        self.offsets = offsets
+        self.rows = rows
+        self.n_probe = n_probe
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def train(
+        cls,
+        vectors: np.ndarray,
+        n_lists: int = 0,
+        n_probe: int = 8,
+        iterations: int = 10,
+        seed: int = 0,
+    ) -> IVFIndex:
+        """训练簇心并分配全部向量；``n_lists`` 为 0 时取 √N。"""
+
+        total = len(vectors)
+        if total == 0:
+            raise ValueError("无法在空矩阵上训练 IVF 索引")
+        n_lists = n_lists or max(1, int(round(math.sqrt(total))))
+        n_lists = min(n_lists, total)
+        rng = np.random.default_rng(seed)
+
+        sample_size = min(total, n_lists * cls.SAMPLES_PER_LIST)
+        sample_rows = np.sort(rng.choice(total, size=sample_size, replace=False))
+        sample = np.asarray(vectors[sample_rows], dtype=np.float32)
+        centroids = sample[rng.choice(sample_size, size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = cls._nearest(sample, centroids)
+            centroids = cls._update_centroids(sample, assignment, centroids, rng)
+
+        assignment = cls._nearest(vectors, centroids)
+        counts = np.bincount(assignment, minlength=n_lists)
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        rows = np.argsort(assignment, kind="stable").astype(np.int32)
+        LOGGER.info(
+            "IVF 索引训练完成：%d 条向量，%d 个簇，最大簇 %d 条",
+            total,
+            n_lists,
+            int(counts.max()),
+        )
+        return cls(vectors, centroids, offsets, rows, n_probe=n_probe)
+
+    def search(
+        self,
+        vector: np.ndarray,
+        top_k: int,
+        exclude_rows: Sequence[int] = (),
+        n_probe: int | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """返回 (行号, 内积得分)，按得分降序，最多 ``top_k`` 条。"""
+
+        (hit,) = self.search_batch(
+            vector[np.newaxis, :], top_k, [exclude_rows], n_probe
+        )
+        return hit
+
+    def search_batch(
+        self,
+        vectors: np.ndarray,
+        top_k: int,
+        exclude_rows: Sequence[Sequence[int]] | None = None,
+        n_probe: int | None = None,
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        """批量检索：簇心得分由一次矩阵乘法得到，随后逐条扫描各自命中的簇。"""
+
+        probe = min(n_probe or self.n_probe, self.n_lists)
+        centroid_scores = vectors @ self.centroids.T
+        if probe < self.n_lists:
+            probed = np.argpartition(centroid_scores, -probe, axis=1)[:, -probe:]
+        else:
+            probed = np.broadcast_to(np.arange(self.n_lists), centroid_scores.shape)
+        if exclude_rows is None:
+            exclude_rows = [()] * len(vectors)
+        return [
+            self._scan_lists(vector, lists, top_k, excluded)
+            for vector, lists, excluded in zip(vectors, probed, exclude_rows)
+        ]
+
+    # ------------------------------------------------------------------ 持久化
+    @staticmethod
+    def fingerprint(vectors: np.ndarray, n_lists: int) -> str:
+        """向量内容与簇数共同决定索引，任一变化都需要重新训练。"""
+
+        digest = hashlib.sha256()
+        digest.update(f"v{IVFIndex.FORMAT_VERSION}:{n_lists}:{vectors.shape}".encode())
+        for start in range(0, len(vectors), IVFIndex.ASSIGN_BATCH):
+            chunk = np.ascontiguousarray(vectors[start : start + IVFIndex.ASSIGN_BATCH])
+            digest.update(chunk.tobytes())
+        return digest.hexdigest()
+
+    def save(self, path: Path, fingerprint: str) -> None:
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open("wb") as fh:
+                np.savez(
+                    fh,
+                    fingerprint=np.asarray(fingerprint),
+                    centroids=self.centroids,
+                    offsets=self.offsets,
+                    rows=self.rows,
+                )
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            LOGGER.warning("写入 IVF 索引失败: %s", exc)
+            tmp_path.unlink(missing_ok=True)
+
+    @classmethod
+    def load(
+        cls,
+        path: Path,
+        vectors: np.ndarray,
+        fingerprint: str,
+        n_probe: int = 8,
+    ) -> IVFIndex | None:
+        if not path.exists():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as payload:
+                if str(payload["fingerprint"]) != fingerprint:
+                    return None
+                return cls(
+                    vectors,
+                    payload["centroids"],
+                    payload["offsets"],
+                    payload["rows"],
+                    n_probe=n_probe,
+                )
+        except (OSError, KeyError, ValueError) as exc:
+            LOGGER.warning("读取 IVF 索引失败，将重新训练: %s", exc)
+            return None
+
+    # ------------------------------------------------------------------ 内部方法
+    def _scan_lists(
+        self,
+        vector: np.ndarray,
+        lists: np.ndarray,
+        top_k: int,
+        exclude_rows: Sequence[int],
+    ) -> tuple[np.ndarray, np.ndarray]:
+        candidates = np.concatenate(
+            [self.rows[self.offsets[idx] : self.offsets[idx + 1]] for idx in lists]
+        )
+        if len(exclude_rows):
+            candidates = candidates[~np.isin(candidates, exclude_rows)]
+        top_k = min(top_k, len(candidates))
+        if top_k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        # 按行号排序后再取向量，内存映射上的读取更接近顺序访问
+        candidates.sort()
+        scores = self.vectors[candidates] @ vector
+        top = np.argpartition(scores, -top_k)[-top_k:]
+        top = top[np.argsort(scores[top])[::-1]]
+        return candidates[top].astype(np.int64), scores[top]
+
+    @classmethod
+    def _nearest(cls, vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        assignment = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), cls.ASSIGN_BATCH):
+            block = np.asarray(
+                vectors[start : start + cls.ASSIGN_BATCH], dtype=np.float32
+            )
+            assignment[start : start + len(block)] = np.argmax(
+                block @ centroids.T, axis=1
+            )
+        return assignment
+
+    @staticmethod
+    def _update_centroids(
+        sample: np.ndarray,
+        assignment: np.ndarray,
+        centroids: np.ndarray,
+        rng: np.random.Generator,
+    ) -> np.ndarray:
+        order = np.argsort(assignment, kind="stable")
+        counts = np.bincount(assignment, minlength=len(centroids))
+        filled = np.flatnonzero(counts)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[filled]
+        updated = centroids.copy()
+        updated[filled] = np.add.reduceat(sample[order], starts, axis=0)
+        # 空簇重新随机选一个样本作为簇心，避免簇数坍缩
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            updated[empty] = sample[rng.choice(len(sample), size=len(empty))]
+        norms = np.linalg.norm(updated, axis=1, keepdims=True)
+        return updated / np.maximum(norms, 1e-12)
+
+
+__all__ = ["IVFIndex"]
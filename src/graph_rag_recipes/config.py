@@ -57,8 +57,55 @@ class ProjectConfig:
     paths: ProjectPaths = field(default_factory=ProjectPaths.from_project_root)
     models: ModelSettings = field(default_factory=ModelSettings)
     howtocook_repo: str = "https://github.com/Anduin2017/HowToCook"
+    ingest_workers: int = 1
     max_neighbors: int = 10
     similarity_threshold: float = 0.2
+    # 食材 Jaccard、食材重叠系数、标签 Jaccard 的加权系数
+    similarity_weights: tuple[float, float, float] = (0.6, 0.3, 0.1)
+    graph_engine: str = "indexed"
+    graph_build_workers: int = 1
+    graph_cache_enabled: bool = True
+    # 检索使用的图表示："csr" 为邻居预排序的只读邻接表，"networkx" 保留原始图
+    graph_backend: str = "csr"
+    embedding_cache_enabled: bool = True
+    # 向量检索后端："exact" 为暴力内积，"ivf" 为近似索引（簇数 0 表示取 √N）
+    embedding_backend: str = "exact"
+    ann_lists: int = 0
+    ann_probe: int = 8
+    # 精确后端的向量存储精度（"float32" / "int8"）与低精度时的精排候选倍数。
+    # int8 常驻内存为 float32 的 1/4，粗排略快，召回靠精排补足；不提供 float16：
+    # 它只省一半内存，NumPy 的 float16 转换却让粗排比 float32 慢约 5 倍
+    embedding_quantization: str = "float32"
+    embedding_rescore_factor: int = 4
+    # 查询向量 LRU 缓存容量，0 表示关闭
+    query_cache_size: int = 1024
+    # 查询向量微批调度：合并窗口（毫秒，0 表示关闭）与单批最大条数
+    embedding_batch_window_ms: float = 0.0
+    embedding_max_batch_size: int = 32
+    # 推荐结果 LRU 缓存容量（0 表示关闭）与单条过期时间（秒，0 表示不过期）
+    result_cache_size: int = 256
+    result_cache_ttl: float = 0.0
+    # LLM 响应缓存：过期时间（秒）与最大条目数
+    llm_cache_enabled: bool = True
+    llm_cache_ttl: float = 7 * 24 * 3600
+    llm_cache_max_entries: int = 10000
+    # OpenAI 兼容接口地址，为空时使用 SDK 默认值（同样读取 OPENAI_BASE_URL）
+    llm_base_url: str | None = None
+    # 异步生成：单次请求超时（秒）、最大重试次数、退避基数（秒）与并发上限
+    llm_timeout: float = 30.0
+    llm_max_retries: int = 2
+    llm_retry_backoff: float = 0.5
+    llm_max_concurrency: int = 8
+    # 推荐理由 prompt 的 token 预算（0 表示不限制）与做法摘要的最大字符数
+    llm_prompt_token_budget: int = 1024
+    llm_prompt_instruction_chars: int = 200
+    # 常驻推荐服务的监听地址与处理请求的线程数
+    service_host: str = "127.0.0.1"
+    service_port: int = 8765
+    service_workers: int = 4
+    # 分阶段计时与直方图；慢请求阈值（毫秒）大于 0 时自动开启并输出明细日志
+    tracing_enabled: bool = False
+    slow_request_ms: float = 0.0
 
     def llm_api_key(self) -> str | None:
         env_key = {
@@ -0,0 +1,197 @@
+"""只读 CSR 邻接表：邻居按权重预排序，检索时无需遍历字典或排序。
+
+检索层在导入期引用 :class:`CSRGraph` 做类型判断，numpy 只在构建数组的方法内
+导入，``import graph_rag_recipes.pipeline`` 不会连带加载 numpy 与 networkx。
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Iterator, Mapping, Sequence, TypeAlias
+
+if TYPE_CHECKING:
+    import networkx as nx
+    import numpy as np
+
+
+class CSRGraph:
+    """由 ``nx.Graph`` 一次性冻结得到的压缩稀疏行（CSR）图。
+
+    ``indptr[i]:indptr[i + 1]`` 给出节点 ``i`` 的邻居区间，区间内的 ``indices`` 与
+    ``weights`` 已按权重降序排列；权重相同的邻居保持原图中的邻接顺序，因此取
+    top-k 与对 networkx 邻居做稳定排序的结果完全一致，但只需 O(k) 的切片。
+    """
+
+    __slots__ = ("node_ids", "indptr", "indices", "weights", "_index", "_node_data")
+
+    def __init__(
+        self,
+        node_ids: list[str],
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        weights: np.ndarray,
+        node_data: list[Mapping[str, Any]],
+    ) -> None:
+        if len(indptr) != len(node_ids) + 1:
+            raise ValueError("indptr 长度必须为节点数 + 1")
+        if len(indices) != len(weights) or len(indices) != int(indptr[-1]):
+            raise ValueError("indices / weights 与 indptr 不一致")
+        self.node_ids = node_ids
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self._index = {node_id: idx for idx, node_id in enumerate(node_ids)}
+        self._node_data = node_data
+
+    @classmethod
+    def from_networkx(cls, graph: nx.Graph) -> CSRGraph:
+        """节点顺序沿用 ``graph.nodes``，节点属性字典直接引用而不复制。"""
+
+        import numpy as np
+
+        node_ids = list(graph.nodes)
+        index = {node_id: idx for idx, node_id in enumerate(node_ids)}
+        adjacency = graph.adj
+        degrees = np.fromiter(
+            (len(adjacency[node_id]) for node_id in node_ids),
+            dtype=np.int64,
+            count=len(node_ids),
+        )
+        indptr = np.zeros(len(node_ids) + 1, dtype=np.int64)
+        np.cumsum(degrees, out=indptr[1:])
+        total = int(indptr[-1])
+
+        indices = np.fromiter(
+            (
+                index[neighbor]
+                for node_id in node_ids
+                for neighbor in adjacency[node_id]
+            ),
+            dtype=np.int32,
+            count=total,
+        )
+        weights = np.fromiter(
+            (
+                attrs.get("weight", 1.0)
+                for node_id in node_ids
+                for attrs in adjacency[node_id].values()
+            ),
+            dtype=np.float64,
+            count=total,
+        )
+        # lexsort 是稳定排序：先按行号分组，组内按权重降序，同权重保持邻接顺序
+        rows = np.repeat(np.arange(len(node_ids), dtype=np.int64), degrees)
+        order = np.lexsort((-weights, rows))
+        node_data = [graph.nodes[node_id] for node_id in node_ids]
+        return cls(node_ids, indptr, indices[order], weights[order], node_data)
+
+    # ------------------------------------------------------------------ 查询接口
+    def __contains__(self, node_id: object) -> bool:
+        return node_id in self._index
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.node_ids)
+
+    def number_of_edges(self) -> int:
+        return len(self.indices) // 2
+
+    def degree(self, node_id: str) -> int:
+        idx = self._index[node_id]
+        return int(self.indptr[idx + 1] - self.indptr[idx])
+
+    def node_data(self, node_id: str) -> Mapping[str, Any]:
+        return self._node_data[self._index[node_id]]
+
+    def iter_nodes(self) -> Iterator[tuple[str, Mapping[str, Any]]]:
+        """与 ``graph.nodes(data=True)`` 等价的遍历。"""
+
+        return zip(self.node_ids, self._node_data)
+
+    def neighbors(self, node_id: str) -> list[str]:
+        """全部邻居，按权重降序。"""
+
+        return self.top_neighbors_ids(node_id, None)
+
+    def top_neighbors(self, node_id: str, k: int | None) -> list[tuple[str, float]]:
+        """权重最高的 ``k`` 个邻居及权重；``k`` 为 None 时返回全部。"""
+
+        start, stop = self._bounds(node_id, k)
+        node_ids = self.node_ids
+        return [
+            (node_ids[idx], weight)
+            for idx, weight in zip(
+                self.indices[start:stop].tolist(), self.weights[start:stop].tolist()
+            )
+        ]
+
+    def top_neighbors_ids(self, node_id: str, k: int | None) -> list[str]:
+        start, stop = self._bounds(node_id, k)
+        node_ids = self.node_ids
+        return [node_ids[idx] for idx in self.indices[start:stop].tolist()]
+
+    def top_neighbors_ids_batch(
+        self, node_ids: Sequence[str], k: int | None
+    ) -> list[list[str]]:
+        """多个节点的 top-k 邻居，与 ``node_ids`` 一一对应；不存在的节点返回空列表。
+
+        各节点的邻居区间由一次向量化的 gather 取出，再按区间长度切分。
+        """
+
+        import numpy as np
+
+        rows = np.fromiter(
+            (self._index.get(node_id, -1) for node_id in node_ids),
+            dtype=np.int64,
+            count=len(node_ids),
+        )
+        known = rows >= 0
+        starts = np.where(known, self.indptr[rows], 0)
+        stops = np.where(known, self.indptr[rows + 1], 0)
+        if k is not None:
+            stops = np.minimum(stops, starts + max(k, 0))
+        lengths = stops - starts
+        # 展开为各区间下标的拼接：区间起点按长度重复，再加上区间内的偏移
+        ends = np.cumsum(lengths)
+        positions = np.repeat(starts - ends + lengths, lengths) + np.arange(
+            ends[-1] if len(ends) else 0
+        )
+        flat = self.indices[positions].tolist()
+
+        names = self.node_ids
+        grouped: list[list[str]] = []
+        offset = 0
+        for length in lengths.tolist():
+            grouped.append([names[idx] for idx in flat[offset : offset + length]])
+            offset += length
+        return grouped
+
+    def weight(self, left: str, right: str) -> float | None:
+        """两节点之间的边权；不相邻时返回 None。"""
+
+        import numpy as np
+
+        start, stop = self._bounds(left, None)
+        target = self._index.get(right)
+        if target is None:
+            return None
+        hits = np.flatnonzero(self.indices[start:stop] == target)
+        return float(self.weights[start + hits[0]]) if len(hits) else None
+
+    # ------------------------------------------------------------------ 内部方法
+    def _bounds(self, node_id: str, k: int | None) -> tuple[int, int]:
+        idx = self._index.get(node_id)
+        if idx is None:
+            raise KeyError(f"节点不存在: {node_id}")
+        start = int(self.indptr[idx])
+        stop = int(self.indptr[idx + 1])
+        if k is not None:
+            stop = min(stop, start + max(k, 0))
+        return start, stop
+
+
+# 检索层同时接受 networkx 图与 CSR 图；仅用于注解，写成字符串以免运行期导入 networkx
+GraphLike: TypeAlias = "nx.Graph | CSRGraph"
+
+__all__ = ["CSRGraph", "GraphLike"]
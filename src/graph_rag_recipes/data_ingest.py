@@ -2,17 +2,20 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import os
 import re
 import shutil
 import subprocess
 import zipfile
-from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
 from pathlib import Path
-from typing import Iterable, Iterator, Sequence
-
-import requests
+from typing import Any, BinaryIO, Iterable, Iterator, Mapping, Sequence
 
 from .config import ProjectConfig
 from .data_models import RecipeRecord
@@ -28,10 +31,67 @@ EXCLUDED_DIR_PARTS = {
 }
 
 
+# 并行解析时每个任务包含的文件数，过小会放大进程间通信开销
+PARSE_CHUNK_SIZE = 16
+
+
 class DatasetAcquisitionError(RuntimeError):
     """表示在下载/刷新 HowToCook 数据集时出现的问题。"""
 
 
+@dataclass(slots=True)
+class ManifestEntry:
+    """记录单个 Markdown 文件的解析状态，用于判断是否需要重新解析。
+
+    ``sha256`` 为空表示解析时未计算摘要（当时没有旧清单可比对）。
+    """
+
+    path: str
+    mtime_ns: int
+    size: int
+    sha256: str
+    recipe_id: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "path": self.path,
+            "mtime_ns": self.mtime_ns,
+            "size": self.size,
+            "sha256": self.sha256,
+            "recipe_id": self.recipe_id,
+        }
+
+    @classmethod
+    def from_mapping(cls, payload: Mapping[str, Any]) -> "ManifestEntry":
+        return cls(
+            path=str(payload["path"]),
+            mtime_ns=int(payload.get("mtime_ns", 0)),
+            size=int(payload.get("size", -1)),
+            sha256=str(payload.get("sha256", "")),
+            recipe_id=payload.get("recipe_id"),
+        )
+
+
+@dataclass(slots=True)
+class DatasetChanges:
+    """一次增量刷新中新增、修改与删除的菜谱 ID。"""
+
+    added: list[str] = field(default_factory=list)
+    modified: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.modified or self.removed)
+
+    def summary(self) -> str:
+        return (
+            f"新增 {len(self.added)} 条，修改 {len(self.modified)} 条，"
+            f"删除 {len(self.removed)} 条，未变化 {self.unchanged} 条"
+        )
+
+
 @dataclass(slots=True)
 class SectionConfig:
     key: str
@@ -82,11 +142,111 @@ SECTION_CONFIGS: tuple[SectionConfig, ...] = (
 )
 
 
+def _encode_record(record: RecipeRecord) -> bytes:
+    return json.dumps(record.to_dict(), ensure_ascii=False).encode("utf-8")
+
+
+def _digest(line: bytes) -> str:
+    return hashlib.sha256(line).hexdigest()
+
+
+class _ProcessedWriter:
+    """逐条写入 JSONL 并记录每条菜谱的字节偏移，提交时原子替换目标文件。"""
+
+    def __init__(self, target: Path, offsets_path: Path) -> None:
+        self.target = target
+        self.offsets_path = offsets_path
+        self.offsets: dict[str, int] = {}
+        self.count = 0
+        self._tmp_path = target.with_name(target.name + ".tmp")
+        self._fh: BinaryIO | None = None
+
+    def __enter__(self) -> "_ProcessedWriter":
+        self._fh = self._tmp_path.open("wb")
+        return self
+
+    def write(self, record: RecipeRecord) -> bytes:
+        """写入一条菜谱并返回其编码后的行（不含换行符）。"""
+
+        line = _encode_record(record)
+        self.offsets.setdefault(record.recipe_id, self._fh.tell())
+        self._fh.write(line + b"\n")
+        self.count += 1
+        return line
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._fh.close()
+        if exc_type is not None:
+            self._tmp_path.unlink(missing_ok=True)
+            return
+        offsets_tmp = self.offsets_path.with_name(self.offsets_path.name + ".tmp")
+        offsets_tmp.write_text(
+            json.dumps(self.offsets, ensure_ascii=False), encoding="utf-8"
+        )
+        os.replace(self._tmp_path, self.target)
+        os.replace(offsets_tmp, self.offsets_path)
+
+
+class _PreviousDataset:
+    """上一版结构化数据的轻量索引：每条菜谱只保留内容摘要与行偏移。
+
+    复用未变化的菜谱时按偏移回读单行，不把整份旧数据常驻内存；旧版 JSON
+    数组没有行偏移，只用于判断变化，不提供复用。
+    """
+
+    def __init__(self, path: Path | None) -> None:
+        self.path = path
+        self.entries: dict[str, tuple[str, int | None]] = {}
+        self._fh: BinaryIO | None = None
+
+    def __enter__(self) -> "_PreviousDataset":
+        if self.path is None or not self.path.exists():
+            return self
+        if self.path.name == HowToCookIngestor.LEGACY_PROCESSED_FILE:
+            with self.path.open(encoding="utf-8") as fh:
+                for item in json.load(fh):
+                    record = RecipeRecord.from_mapping(item)
+                    digest = _digest(_encode_record(record))
+                    self.entries.setdefault(record.recipe_id, (digest, None))
+            return self
+
+        self._fh = self.path.open("rb")
+        offset = 0
+        for line in self._fh:
+            content = line.rstrip(b"\r\n")
+            if content.strip():
+                recipe_id = str(json.loads(content).get("recipe_id"))
+                self.entries.setdefault(recipe_id, (_digest(content), offset))
+            offset += len(line)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._fh is not None:
+            self._fh.close()
+
+    def __contains__(self, recipe_id: str) -> bool:
+        return recipe_id in self.entries
+
+    def digest(self, recipe_id: str) -> str | None:
+        entry = self.entries.get(recipe_id)
+        return entry[0] if entry else None
+
+    def load(self, recipe_id: str) -> RecipeRecord | None:
+        entry = self.entries.get(recipe_id)
+        if entry is None or entry[1] is None or self._fh is None:
+            return None
+        self._fh.seek(entry[1])
+        return RecipeRecord.from_mapping(json.loads(self._fh.readline()))
+
+
 class HowToCookIngestor:
     """负责下载/缓存 HowToCook 数据并提供结构化记录。"""
 
     SAMPLE_FILE = "sample_recipes.json"
-    PROCESSED_FILE = "recipes_index.json"
+    PROCESSED_FILE = "recipes_index.jsonl"
+    OFFSETS_FILE = "recipes_index.offsets.json"
+    LEGACY_PROCESSED_FILE = "recipes_index.json"
+    MANIFEST_FILE = "recipes_manifest.json"
     REPO_DIRNAME = "howtocook_repo"
     ARCHIVE_NAME = "howtocook_repo.zip"
 
@@ -94,6 +254,8 @@ class HowToCookIngestor:
         self.config = config or ProjectConfig()
         self.paths = self.config.paths
         self.repo_dir = self.paths.raw_data_dir / self.REPO_DIRNAME
+        self.workers = max(1, self.config.ingest_workers)
+        self._offsets_cache: tuple[int, dict[str, int]] | None = None
         self.paths.ensure()
 
     # ------------------------------------------------------------------ 数据准备
@@ -131,41 +293,158 @@ class HowToCookIngestor:
     ) -> Path:
         """将 Markdown 菜谱解析为结构化 JSON，便于管线加载。"""
 
-        target = self.paths.processed_data_dir / self.PROCESSED_FILE
+        target = self.processed_path()
         if target.exists() and not force:
             return target
 
+        self._sync_processed_dataset(limit, ensure_dataset, incremental=False)
+        return self.processed_path()
+
+    def refresh_processed_dataset(
+        self, limit: int | None = None, ensure_dataset: bool = True
+    ) -> DatasetChanges:
+        """依据文件清单增量刷新：只重新解析新增或修改的文件，并剔除已删除的文件。"""
+
+        return self._sync_processed_dataset(limit, ensure_dataset, incremental=True)
+
+    def _sync_processed_dataset(
+        self, limit: int | None, ensure_dataset: bool, incremental: bool
+    ) -> DatasetChanges:
         dataset_root: Path | None = None
         if ensure_dataset:
             dataset_root = self.prepare_local_copy()
         elif self.repo_dir.exists():
             dataset_root = self.repo_dir
 
-        records: list[RecipeRecord]
-        if dataset_root and dataset_root.is_dir():
-            records = list(self._iter_repo_records(dataset_root, limit))
+        # 全量重建不比对旧数据，也就不必扫描旧文件
+        manifest = self._load_manifest() if incremental else {}
+        synced: dict[str, ManifestEntry] = {}
+        changes = DatasetChanges()
+        current_ids: set[str] = set()
+        processed = self.paths.processed_data_dir
+        with (
+            _PreviousDataset(
+                self.processed_path() if incremental else None
+            ) as previous,
+            _ProcessedWriter(
+                processed / self.PROCESSED_FILE, processed / self.OFFSETS_FILE
+            ) as writer,
+        ):
+            records: Iterable[RecipeRecord]
+            if dataset_root and dataset_root.is_dir():
+                records = self._sync_repo_records(
+                    dataset_root, limit, manifest, previous, synced
+                )
+            else:
+                LOGGER.warning("未找到可用的 HowToCook 仓库，回退到内置示例数据。")
+                records = self.load_sample_records(limit)
+
+            for record in records:
+                line = writer.write(record)
+                self._track_change(changes, previous, current_ids, record, line)
+            if not writer.count:
+                synced.clear()
+                for record in self.load_sample_records(limit):
+                    line = writer.write(record)
+                    self._track_change(changes, previous, current_ids, record, line)
+
+        changes.removed = [
+            recipe_id for recipe_id in previous.entries if recipe_id not in current_ids
+        ]
+        self._write_manifest(synced)
+        return changes
+
+    @staticmethod
+    def _track_change(
+        changes: DatasetChanges,
+        previous: _PreviousDataset,
+        current_ids: set[str],
+        record: RecipeRecord,
+        line: bytes,
+    ) -> None:
+        current_ids.add(record.recipe_id)
+        digest = previous.digest(record.recipe_id)
+        if digest is None:
+            changes.added.append(record.recipe_id)
+        elif digest != _digest(line):
+            changes.modified.append(record.recipe_id)
         else:
-            LOGGER.warning("未找到可用的 HowToCook 仓库，回退到内置示例数据。")
-            records = self.load_sample_records(limit)
+            changes.unchanged += 1
 
-        if not records:
-            records = self.load_sample_records(limit)
+    # ------------------------------------------------------------------ 数据加载
+    def processed_path(self) -> Path:
+        """当前生效的结构化数据文件：优先 JSONL，其次兼容旧版 JSON 数组。"""
 
-        payload = [record.to_dict() for record in records]
-        target.write_text(
-            json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
-        return target
+        jsonl_path = self.paths.processed_data_dir / self.PROCESSED_FILE
+        legacy_path = self.paths.processed_data_dir / self.LEGACY_PROCESSED_FILE
+        if not jsonl_path.exists() and legacy_path.exists():
+            return legacy_path
+        return jsonl_path
 
-    # ------------------------------------------------------------------ 数据加载
     def load_processed_records(self, limit: int | None = None) -> list[RecipeRecord]:
-        processed_path = self.paths.processed_data_dir / self.PROCESSED_FILE
+        return list(self.iter_processed_records(limit))
+
+    def iter_processed_records(
+        self, limit: int | None = None
+    ) -> Iterator[RecipeRecord]:
+        """逐行流式读取 JSONL，只解析前 ``limit`` 条；旧版 JSON 需整体加载。"""
+
+        processed_path = self.processed_path()
         if not processed_path.exists():
-            return []
-        with processed_path.open(encoding="utf-8") as fh:
-            payload = json.load(fh)
-        records = [RecipeRecord.from_mapping(item) for item in payload]
-        return records[:limit] if limit else records
+            return
+        if processed_path.name == self.LEGACY_PROCESSED_FILE:
+            with processed_path.open(encoding="utf-8") as fh:
+                payload = json.load(fh)
+            records = [RecipeRecord.from_mapping(item) for item in payload]
+            yield from records[:limit] if limit else records
+            return
+
+        emitted = 0
+        with processed_path.open("rb") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                yield RecipeRecord.from_mapping(json.loads(line))
+                emitted += 1
+                if limit and emitted >= limit:
+                    return
+
+    def get_processed_record(self, recipe_id: str) -> RecipeRecord | None:
+        """借助偏移索引定位单条菜谱，只需一次 seek 与一次行读取。"""
+
+        processed_path = self.processed_path()
+        offsets = self._load_offsets()
+        if offsets is None or processed_path.name != self.PROCESSED_FILE:
+            return next(
+                (
+                    record
+                    for record in self.iter_processed_records()
+                    if record.recipe_id == recipe_id
+                ),
+                None,
+            )
+        offset = offsets.get(recipe_id)
+        if offset is None:
+            return None
+        with processed_path.open("rb") as fh:
+            fh.seek(offset)
+            return RecipeRecord.from_mapping(json.loads(fh.readline()))
+
+    def _load_offsets(self) -> dict[str, int] | None:
+        offsets_path = self.paths.processed_data_dir / self.OFFSETS_FILE
+        try:
+            stamp = offsets_path.stat().st_mtime_ns
+        except OSError:
+            return None
+        if self._offsets_cache and self._offsets_cache[0] == stamp:
+            return self._offsets_cache[1]
+        try:
+            offsets = json.loads(offsets_path.read_text(encoding="utf-8"))
+        except ValueError as exc:
+            LOGGER.warning("偏移索引损坏，将回退为顺序扫描: %s", exc)
+            return None
+        self._offsets_cache = (stamp, offsets)
+        return offsets
 
     def load_sample_records(self, limit: int | None = None) -> list[RecipeRecord]:
         """提供一组迷你示例，便于快速验证图构建逻辑。"""
@@ -183,8 +462,35 @@ class HowToCookIngestor:
         records = [RecipeRecord.from_mapping(item) for item in payload]
         return records[:limit] if limit else records
 
+    def dataset_sources(self) -> list[Path]:
+        """``iter_records`` 读取的数据文件，供下游缓存计算数据集指纹。"""
+
+        return [
+            self.processed_path(),
+            self.paths.processed_data_dir / self.SAMPLE_FILE,
+        ]
+
+    def _load_manifest(self) -> dict[str, ManifestEntry]:
+        manifest_path = self.paths.processed_data_dir / self.MANIFEST_FILE
+        if not manifest_path.exists():
+            return {}
+        try:
+            payload = json.loads(manifest_path.read_text(encoding="utf-8"))
+            entries = [ManifestEntry.from_mapping(item) for item in payload]
+        except (ValueError, KeyError, TypeError) as exc:
+            LOGGER.warning("文件清单损坏，将全量解析: %s", exc)
+            return {}
+        return {entry.path: entry for entry in entries}
+
+    def _write_manifest(self, manifest: Mapping[str, ManifestEntry]) -> None:
+        manifest_path = self.paths.processed_data_dir / self.MANIFEST_FILE
+        payload = [entry.to_dict() for entry in manifest.values()]
+        manifest_path.write_text(
+            json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+
     def iter_records(self, limit: int | None = None) -> Iterable[RecipeRecord]:
-        processed = self.load_processed_records(limit)
+        processed = self.iter_processed_records(limit)
         samples = self.load_sample_records()
         seen: set[str] = set()
         emitted = 0
@@ -249,6 +555,9 @@ class HowToCookIngestor:
             LOGGER.warning("git pull 失败，将保留本地缓存: %s", exc)
 
     def _download_archive(self) -> Path:
+        # requests 只在下载压缩包时用到，推迟导入以缩短启动时间
+        import requests
+
         archive_path = self.paths.raw_data_dir / self.ARCHIVE_NAME
         last_error: Exception | None = None
 
@@ -288,42 +597,149 @@ class HowToCookIngestor:
         return (strategy,)
 
     # ------------------------------------------------------------------ Markdown 解析
-    def _iter_repo_records(
-        self, repo_dir: Path, limit: int | None = None
+    def _sync_repo_records(
+        self,
+        repo_dir: Path,
+        limit: int | None,
+        manifest: Mapping[str, ManifestEntry],
+        previous: _PreviousDataset,
+        synced: dict[str, ManifestEntry],
     ) -> Iterator[RecipeRecord]:
+        """按文件顺序产出菜谱：清单命中且记录仍在的文件直接复用，其余重新解析。
+
+        文件随解析进度逐个检查，达到 ``limit`` 后剩余文件不再读取；只有清单中
+        已有条目且 mtime 或大小变化时才计算 sha256，用于识别内容未变的文件。
+        已处理文件的清单条目会写入 ``synced``，便于调用方边解析边落盘。
+        """
+
+        plan: deque[tuple[ManifestEntry, RecipeRecord | None, bool]] = deque()
+
+        def schedule() -> Iterator[Path | None]:
+            for md_file in self._iter_markdown_files(repo_dir):
+                step = self._plan_file(md_file, repo_dir, manifest, previous)
+                plan.append(step)
+                yield md_file if step[2] else None
+
+        parsed = self._parse_files(schedule(), repo_dir)
+        emitted = 0
+        try:
+            for result in parsed:
+                entry, record, needs_parse = plan.popleft()
+                if needs_parse:
+                    record = result
+                entry.recipe_id = record.recipe_id if record else None
+                synced[entry.path] = entry
+                if not record:
+                    continue
+                yield record
+                emitted += 1
+                if limit and emitted >= limit:
+                    break
+        finally:
+            parsed.close()
+
+    @staticmethod
+    def _plan_file(
+        md_file: Path,
+        repo_dir: Path,
+        manifest: Mapping[str, ManifestEntry],
+        previous: _PreviousDataset,
+    ) -> tuple[ManifestEntry, RecipeRecord | None, bool]:
+        """返回 (新清单条目, 可复用的旧记录, 是否需要重新解析)。"""
+
+        relative = md_file.relative_to(repo_dir).as_posix()
+        stat = md_file.stat()
+        old = manifest.get(relative)
+        if old is None:
+            # 没有可比对的旧摘要，无论如何都要解析
+            digest = ""
+        elif old.mtime_ns == stat.st_mtime_ns and old.size == stat.st_size:
+            digest = old.sha256
+        else:
+            digest = hashlib.sha256(md_file.read_bytes()).hexdigest()
+        entry = ManifestEntry(relative, stat.st_mtime_ns, stat.st_size, digest)
+
+        if old is not None and old.sha256 == digest:
+            if old.recipe_id is None:
+                return entry, None, False
+            cached = previous.load(old.recipe_id)
+            if cached is not None:
+                return entry, cached, False
+        return entry, None, True
+
+    def _iter_markdown_files(self, repo_dir: Path) -> list[Path]:
+        """排序后的候选菜谱文件，保证多次解析的输出顺序一致。"""
+
         search_root = repo_dir / "dishes"
         if not search_root.exists():
             search_root = repo_dir
 
-        candidates = (
+        return sorted(
             path
             for path in search_root.rglob("*.md")
             if path.is_file()
             and path.name.lower() not in {"readme.md", "license.md"}
             and not self._should_skip_file(repo_dir, path)
         )
-        counter = 0
-        for md_file in candidates:
-            record = self._parse_markdown_file(md_file, repo_dir)
-            if not record:
-                continue
-            yield record
-            counter += 1
-            if limit and counter >= limit:
-                break
 
-    def _parse_markdown_file(
-        self, md_file: Path, repo_dir: Path
-    ) -> RecipeRecord | None:
+    def _parse_files(
+        self, md_files: Iterable[Path | None], repo_dir: Path
+    ) -> Iterator[RecipeRecord | None]:
+        """按输入顺序惰性解析文件，输入为 ``None`` 或解析失败的位置产出 ``None``。
+
+        输入同样按需消费。``workers`` 大于 1 时按块分发到进程池，并只保持有限
+        数量的在途分块：调用方因 ``limit`` 提前停止消费时，不会把剩余文件全部
+        解析一遍；全部为 ``None`` 的分块不提交，进程池在首次需要解析时才创建。
+        """
+
+        files = iter(md_files)
+        if self.workers <= 1:
+            for md_file in files:
+                if md_file is None:
+                    yield None
+                else:
+                    yield self._parse_markdown_file(md_file, repo_dir)
+            return
+
+        chunks = iter(lambda: list(islice(files, PARSE_CHUNK_SIZE)), [])
+        executor: ProcessPoolExecutor | None = None
+        pending: deque[Future[list[RecipeRecord | None]]] = deque()
+
+        def submit(chunk: list[Path | None]) -> None:
+            nonlocal executor
+            if not any(chunk):
+                skipped: Future[list[RecipeRecord | None]] = Future()
+                skipped.set_result([None] * len(chunk))
+                pending.append(skipped)
+                return
+            if executor is None:
+                executor = ProcessPoolExecutor(max_workers=self.workers)
+            pending.append(executor.submit(_parse_markdown_chunk, chunk, repo_dir))
+
+        try:
+            for chunk in islice(chunks, self.workers * 2):
+                submit(chunk)
+            while pending:
+                results = pending.popleft().result()
+                next_chunk = next(chunks, None)
+                if next_chunk is not None:
+                    submit(next_chunk)
+                yield from results
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    @classmethod
+    def _parse_markdown_file(cls, md_file: Path, repo_dir: Path) -> RecipeRecord | None:
         text = md_file.read_text(encoding="utf-8", errors="ignore")
-        title = self._extract_title(text) or md_file.stem
-        sections = self._extract_sections(text)
+        title = cls._extract_title(text) or md_file.stem
+        sections = cls._extract_sections(text)
 
-        ingredients = self._normalize_list(sections.get("ingredients", []))
-        seasonings = self._normalize_list(sections.get("seasonings", []))
+        ingredients = cls._normalize_list(sections.get("ingredients", []))
+        seasonings = cls._normalize_list(sections.get("seasonings", []))
         instructions_lines = sections.get("instructions", [])
         instructions = "\n".join(line for line in instructions_lines if line).strip()
-        tags = self._derive_tags(md_file, repo_dir)
+        tags = cls._derive_tags(md_file, repo_dir)
 
         if not instructions or not (ingredients or seasonings):
             return None
@@ -345,7 +761,8 @@ class HowToCookIngestor:
         match = re.search(r"^\s*#\s+(.+)$", text, re.MULTILINE)
         return match.group(1).strip() if match else None
 
-    def _extract_sections(self, text: str) -> dict[str, list[str]]:
+    @classmethod
+    def _extract_sections(cls, text: str) -> dict[str, list[str]]:
         sections: dict[str, list[str]] = {"text": []}
         current_key = "text"
         heading_pattern = re.compile(r"^#{2,4}\s*(.+?)\s*$")
@@ -354,7 +771,7 @@ class HowToCookIngestor:
             line = raw_line.strip()
             heading_match = heading_pattern.match(line)
             if heading_match:
-                normalized = self._match_section_key(heading_match.group(1))
+                normalized = cls._match_section_key(heading_match.group(1))
                 current_key = normalized or "text"
                 if current_key not in sections:
                     sections[current_key] = []
@@ -388,7 +805,8 @@ class HowToCookIngestor:
             for part in relative_parts
         )
 
-    def _match_section_key(self, heading: str) -> str | None:
+    @staticmethod
+    def _match_section_key(heading: str) -> str | None:
         heading_normalized = heading.replace("：", "").replace(":", "")
         for section in SECTION_CONFIGS:
             if any(alias in heading_normalized for alias in section.aliases):
@@ -423,4 +841,17 @@ class HowToCookIngestor:
         ]
 
 
-__all__ = ["HowToCookIngestor"]
+def _parse_markdown_chunk(
+    md_files: Sequence[Path | None], repo_dir: Path
+) -> list[RecipeRecord | None]:
+    """进程池任务：解析一块 Markdown 文件，保持输入顺序，``None`` 原样跳过。"""
+
+    return [
+        None
+        if md_file is None
+        else HowToCookIngestor._parse_markdown_file(md_file, repo_dir)
+        for md_file in md_files
+    ]
+
+
+__all__ = ["DatasetChanges", "HowToCookIngestor", "ManifestEntry"]
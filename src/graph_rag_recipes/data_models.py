@@ -66,6 +66,33 @@ class RecommendationResult:
             f"理由: {self.explanation or '待生成'}"
         )
 
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "reference_recipe": self.reference_recipe.to_dict(),
+            "similar_recipes": [recipe.to_dict() for recipe in self.similar_recipes],
+            "explanation": self.explanation,
+        }
+
+    @classmethod
+    def from_mapping(cls, payload: Mapping[str, Any]) -> "RecommendationResult":
+        return cls(
+            reference_recipe=RecipeRecord.from_mapping(payload["reference_recipe"]),
+            similar_recipes=[
+                RecipeRecord.from_mapping(item)
+                for item in payload.get("similar_recipes", [])
+            ],
+            explanation=payload.get("explanation", ""),
+        )
+
+
+@dataclass(slots=True)
+class RetrievalResult:
+    """检索阶段的产出，交给生成阶段补全推荐理由。"""
+
+    reference_recipe: RecipeRecord
+    similar_recipes: Sequence[RecipeRecord]
+    user_input: str
+
 
 @dataclass(slots=True)
 class UserProfile:
@@ -0,0 +1,111 @@
+"""按内容寻址的菜谱向量磁盘缓存。"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Callable, Sequence
+
+import numpy as np
+
+LOGGER = logging.getLogger(__name__)
+
+
+class EmbeddingStore:
+    """以 (模型名, 文本哈希) 为键的向量库，向量保存为 ``.npy`` 并以内存映射读取。
+
+    每个模型独占一个子目录：``vectors.npy`` 按行存放向量，``keys.json`` 记录每行对应
+    的文本哈希。库的行顺序总是与最近一次请求的顺序一致，因此数据未变化时可以直接
+    返回内存映射的切片，不发生任何拷贝。
+    """
+
+    VECTORS_FILE = "vectors.npy"
+    KEYS_FILE = "keys.json"
+
+    def __init__(self, directory: Path, model_name: str) -> None:
+        self.model_name = model_name
+        slug = re.sub(r"[^0-9A-Za-z_.-]+", "_", model_name).strip("_") or "default"
+        self.directory = directory / slug
+        self.vectors_path = self.directory / self.VECTORS_FILE
+        self.keys_path = self.directory / self.KEYS_FILE
+
+    @staticmethod
+    def content_key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def fetch(
+        self,
+        texts: Sequence[str],
+        encode: Callable[[list[str]], np.ndarray],
+    ) -> np.ndarray:
+        """返回与 ``texts`` 逐行对应的向量，只对库中缺失的文本调用 ``encode``。"""
+
+        keys = [self.content_key(text) for text in texts]
+        stored_keys, stored = self._load()
+        if stored is not None and stored_keys[: len(keys)] == keys:
+            return stored[: len(keys)]
+
+        positions = {key: row for row, key in enumerate(stored_keys)}
+        missing: dict[str, int] = {}
+        for idx, key in enumerate(keys):
+            if key not in positions and key not in missing:
+                missing[key] = idx
+        LOGGER.info(
+            "向量缓存命中 %d/%d 条，需重新编码 %d 条",
+            len(keys) - len(missing),
+            len(keys),
+            len(missing),
+        )
+
+        fresh: np.ndarray | None = None
+        if missing:
+            fresh = np.asarray(
+                encode([texts[idx] for idx in missing.values()]), dtype=np.float32
+            )
+        if fresh is not None and len(fresh):
+            dim = fresh.shape[1]
+        elif stored is not None:
+            dim = stored.shape[1]
+        else:
+            return np.empty((0, 0), dtype=np.float32)
+
+        fresh_rows = {key: row for row, key in enumerate(missing)}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_vectors = self.vectors_path.with_suffix(".tmp.npy")
+        matrix = np.lib.format.open_memmap(
+            tmp_vectors, mode="w+", dtype=np.float32, shape=(len(keys), dim)
+        )
+        for idx, key in enumerate(keys):
+            if key in fresh_rows:
+                matrix[idx] = fresh[fresh_rows[key]]
+            else:
+                matrix[idx] = stored[positions[key]]
+        matrix.flush()
+        del matrix
+
+        tmp_keys = self.keys_path.with_suffix(".tmp")
+        tmp_keys.write_text(json.dumps(keys), encoding="utf-8")
+        os.replace(tmp_vectors, self.vectors_path)
+        os.replace(tmp_keys, self.keys_path)
+        return np.load(self.vectors_path, mmap_mode="r")
+
+    def _load(self) -> tuple[list[str], np.ndarray | None]:
+        if not self.vectors_path.exists() or not self.keys_path.exists():
+            return [], None
+        try:
+            keys = json.loads(self.keys_path.read_text(encoding="utf-8"))
+            vectors = np.load(self.vectors_path, mmap_mode="r")
+        except (OSError, ValueError) as exc:
+            LOGGER.warning("读取向量缓存失败，将重新编码: %s", exc)
+            return [], None
+        if vectors.ndim != 2 or len(vectors) != len(keys):
+            LOGGER.warning("向量缓存与键列表不一致，将重新编码。")
+            return [], None
+        return keys, vectors
+
+
+__all__ = ["EmbeddingStore"]
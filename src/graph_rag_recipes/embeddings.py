@@ -3,134 +3,403 @@
 from __future__ import annotations
 
 import logging
-from typing import Sequence
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Sequence
 
 import numpy as np
 
+from .ann_index import IVFIndex
 from .data_models import RecipeRecord
-
-try:
-    from sentence_transformers import SentenceTransformer
-except ImportError:  # pragma: no cover - sentence-transformers 为可选依赖
-    SentenceTransformer = None  # type: ignore
+from .embedding_store import EmbeddingStore
+from .lazy_imports import module_available, optional_module
+from .lru import CacheStats, LRUCache
+from .micro_batch import BatchStats, MicroBatcher
+from .quantization import QuantizedMatrix
+from .recipe_store import RecipeLike, RecipeStore, RecipeView
 
 LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class _SearchRequest:
+    """微批调度中的单条检索请求。"""
+
+    text: str
+    top_k: int
+    exclude: Sequence[str] | None
+    stored_row: int | None
+
+
 class RecipeEmbeddingIndex:
-    """维护菜谱向量，支持文本检索与语义相似度计算。"""
+    """维护菜谱向量，支持文本检索与语义相似度计算。
+
+    传入 ``cache_dir`` 时，菜谱向量会缓存到磁盘，重复启动只编码新增或修改的菜谱。
+    模型（连带 torch）推迟到第一次需要编码时才加载：向量全部命中磁盘缓存时，
+    启动阶段不加载模型，直到出现未缓存的查询文本。
+    向量矩阵的行号与 :class:`RecipeStore` 行号一一对应，检索结果直接返回存储视图。
+
+    ``backend="ivf"`` 时检索改走 :class:`IVFIndex` 近似索引，``ann_probe`` 控制
+    召回与延迟的权衡；启用磁盘缓存时训练好的索引也一并保存。
+
+    ``quantization`` 为 ``"int8"`` 时，精确后端先在量化矩阵上粗排，
+    再用全精度向量精排 ``top_k × rescore_factor`` 条候选；配合磁盘缓存，全精度
+    矩阵只以内存映射形式存在。
+
+    查询向量按文本缓存在容量为 ``query_cache_size`` 的 LRU 中；对已入库菜谱做
+    相似检索时直接取矩阵中的行向量，两条路径都不再调用模型。
 
-    def __init__(self, model_name: str) -> None:
+    ``encoder`` 可注入任何实现 ``encode(texts, **kwargs)`` 的对象替代
+    SentenceTransformer，便于基准与离线环境使用桩编码器。
+
+    ``batch_window_ms`` 大于 0 时启用微批调度：并发线程的检索请求在该窗口内
+    （或凑满 ``max_batch_size`` 条时）合并为一次 ``encode`` 与一次矩阵乘法打分，
+    适合常驻服务；单线程调用会多付出最多一个窗口的等待，默认关闭。
+    """
+
+    BACKENDS = ("exact", "ivf")
+    QUANTIZATION_MODES = ("float32", *QuantizedMatrix.MODES)
+    ANN_FILE = "ivf_index.npz"
+    # 批量精确检索时单个得分块的元素上限（float32 约 64 MiB）
+    SCORE_BLOCK_ELEMENTS = 1 << 24
+
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: Path | None = None,
+        backend: str = "exact",
+        ann_lists: int = 0,
+        ann_probe: int = 8,
+        quantization: str = "float32",
+        rescore_factor: int = 4,
+        query_cache_size: int = 1024,
+        encoder: Any | None = None,
+        batch_window_ms: float = 0.0,
+        max_batch_size: int = 32,
+    ) -> None:
+        if backend not in self.BACKENDS:
+            raise ValueError(f"未知的向量检索后端: {backend}")
+        if quantization not in self.QUANTIZATION_MODES:
+            raise ValueError(f"未知的向量量化方式: {quantization}")
         self.model_name = model_name
-        self._model: SentenceTransformer | None = None
-        self._records: dict[str, RecipeRecord] = {}
-        self._ids: list[str] = []
+        self.backend = backend
+        self.ann_lists = ann_lists
+        self.ann_probe = ann_probe
+        self.quantization = quantization
+        self.rescore_factor = rescore_factor
+        self._cache = EmbeddingStore(cache_dir, model_name) if cache_dir else None
+        self._model: Any | None = encoder
+        self._model_lock = threading.Lock()
+        self._recipes = RecipeStore()
         self._matrix: np.ndarray | None = None
-        self._enabled = SentenceTransformer is not None
+        self._ann: IVFIndex | None = None
+        self._quantized: QuantizedMatrix | None = None
+        self._query_cache: LRUCache[str, np.ndarray] = LRUCache(query_cache_size)
+        self.stored_vector_hits = 0
+        self._batcher: MicroBatcher[_SearchRequest, list[RecipeLike]] | None = None
+        if batch_window_ms > 0:
+            self._batcher = MicroBatcher(
+                self._search_requests,
+                max_batch_size=max_batch_size,
+                max_wait_ms=batch_window_ms,
+                name="embedding-batch",
+            )
+        # sentence-transformers 会连带导入 torch，只检查是否安装，首次编码时再导入
+        self._enabled = encoder is not None or module_available("sentence_transformers")
 
-    def build(self, records: Sequence[RecipeRecord]) -> None:
+    def build(self, records: Sequence[RecipeRecord] | RecipeStore) -> None:
         """根据传入菜谱生成或更新向量索引。"""
 
-        self._records = {record.recipe_id: record for record in records}
+        self._recipes = (
+            records if isinstance(records, RecipeStore) else RecipeStore(records)
+        )
+        self._matrix = None
+        self._ann = None
+        self._quantized = None
         if not self._enabled:
             return
-        self._ensure_model()
-        if not self._model:
-            return
-        texts = [record.as_prompt_chunk() for record in records]
+        texts = [record.as_prompt_chunk() for record in self._recipes]
         try:
-            embeddings = self._model.encode(
-                texts,
-                show_progress_bar=False,
-                convert_to_numpy=True,
-                normalize_embeddings=True,
-            )
+            if self._cache:
+                embeddings = self._cache.fetch(texts, self._encode_batch)
+            else:
+                embeddings = self._encode_batch(texts)
         except Exception as exc:  # pragma: no cover - 依赖模型下载
             LOGGER.warning("生成菜谱向量失败: %s", exc)
             self._matrix = None
             return
 
         self._matrix = embeddings
-        self._ids = [record.recipe_id for record in records]
+        if self.backend == "ivf" and len(embeddings):
+            self._ann = self._load_or_train_ann(embeddings)
+        elif self.quantization != "float32" and len(embeddings):
+            self._quantized = QuantizedMatrix.from_matrix(embeddings, self.quantization)
+            if not isinstance(embeddings, np.memmap):
+                LOGGER.warning("未启用向量磁盘缓存，全精度矩阵仍常驻内存。")
 
-    def get_record(self, recipe_id: str) -> RecipeRecord | None:
-        return self._records.get(recipe_id)
+    def get_record(self, recipe_id: str) -> RecipeLike | None:
+        return self._recipes.get(recipe_id)
 
     def query(
         self, text: str, top_k: int = 5, exclude: Sequence[str] | None = None
-    ) -> list[RecipeRecord]:
+    ) -> list[RecipeLike]:
         """根据任意文本检索最接近的菜谱。"""
 
-        if not self._ready():
-            return []
-        vector = self._encode_text(text)
-        if vector is None:
-            return []
-        exclude_set = set(exclude or [])
-        scores = self._matrix @ vector
+        return self.query_batch([text], top_k, [exclude])[0]
 
-        for idx, recipe_id in enumerate(self._ids):
-            if recipe_id in exclude_set:
-                scores[idx] = -1.0
+    def query_batch(
+        self,
+        texts: Sequence[str],
+        top_k: int = 5,
+        excludes: Sequence[Sequence[str] | None] | None = None,
+    ) -> list[list[RecipeLike]]:
+        """批量检索：一次 ``encode`` 编码全部文本，再以矩阵乘法统一打分。
 
-        top_k = min(top_k, len(self._ids))
-        if top_k <= 0:
-            return []
+        ``excludes`` 与 ``texts`` 一一对应，给出每条查询需要排除的菜谱 ID。
+        """
 
-        top_indices = np.argpartition(scores, -top_k)[-top_k:]
-        top_sorted = top_indices[np.argsort(scores[top_indices])[::-1]]
-        results: list[RecipeRecord] = []
-        for idx in top_sorted:
-            if scores[idx] <= 0:
-                continue
-            recipe_id = self._ids[idx]
-            record = self._records.get(recipe_id)
-            if record:
-                results.append(record)
-        return results
+        return self._search(texts, top_k, excludes)
 
     def find_similar_to_recipe(
-        self, recipe: RecipeRecord, top_k: int = 5
-    ) -> list[RecipeRecord]:
+        self, recipe: RecipeLike, top_k: int = 5
+    ) -> list[RecipeLike]:
         """基于语义相似度寻找与特定菜谱接近的其他菜谱。"""
 
-        query_text = recipe.as_prompt_chunk()
-        return self.query(query_text, top_k=top_k + 2, exclude=[recipe.recipe_id])
+        return self.find_similar_to_recipes([recipe], top_k)[0]
+
+    def find_similar_to_recipes(
+        self, recipes: Sequence[RecipeLike], top_k: int = 5
+    ) -> list[list[RecipeLike]]:
+        """:meth:`find_similar_to_recipe` 的批量版本。"""
+
+        texts = [recipe.as_prompt_chunk() for recipe in recipes]
+        return self._search(
+            texts,
+            top_k + 2,
+            [[recipe.recipe_id] for recipe in recipes],
+            [self._stored_row(recipe, text) for recipe, text in zip(recipes, texts)],
+        )
+
+    def query_cache_stats(self) -> CacheStats:
+        """查询向量 LRU 的命中统计。"""
+
+        return self._query_cache.stats()
+
+    def batch_stats(self) -> BatchStats | None:
+        """微批调度的批次规模直方图；未启用微批时返回 ``None``。"""
+
+        return self._batcher.stats() if self._batcher is not None else None
 
     # ------------------------------------------------------------------ 内部方法
+    def _search(
+        self,
+        texts: Sequence[str],
+        top_k: int,
+        excludes: Sequence[Sequence[str] | None] | None,
+        stored_rows: Sequence[int | None] | None = None,
+    ) -> list[list[RecipeLike]]:
+        if not texts:
+            return []
+        if not self._ready():
+            return [[] for _ in texts]
+        if self._batcher is not None:
+            excludes = excludes if excludes is not None else [None] * len(texts)
+            stored_rows = stored_rows or [None] * len(texts)
+            return self._batcher.submit(
+                [
+                    _SearchRequest(text, top_k, exclude, row)
+                    for text, exclude, row in zip(texts, excludes, stored_rows)
+                ]
+            )
+        return self._search_now(texts, top_k, excludes, stored_rows)
+
+    def _search_requests(
+        self, requests: list[_SearchRequest]
+    ) -> list[list[RecipeLike]]:
+        """微批执行体：按最大 ``top_k`` 统一检索，再截断到各请求自己的条数。"""
+
+        hits = self._search_now(
+            [request.text for request in requests],
+            max(request.top_k for request in requests),
+            [request.exclude for request in requests],
+            [request.stored_row for request in requests],
+        )
+        return [found[: request.top_k] for request, found in zip(requests, hits)]
+
+    def _search_now(
+        self,
+        texts: Sequence[str],
+        top_k: int,
+        excludes: Sequence[Sequence[str] | None] | None,
+        stored_rows: Sequence[int | None] | None,
+    ) -> list[list[RecipeLike]]:
+        vectors = self._query_vectors(texts, stored_rows)
+        if vectors is None:
+            return [[] for _ in texts]
+        exclude_rows = [
+            self._exclude_rows(exclude)
+            for exclude in (excludes if excludes is not None else [None] * len(texts))
+        ]
+        if self._ann is not None:
+            hits = self._ann.search_batch(vectors, top_k, exclude_rows)
+        else:
+            hits = self._exact_search_batch(vectors, top_k, exclude_rows)
+        return [
+            [
+                self._recipes.view(int(row))
+                for row, score in zip(rows.tolist(), scores.tolist())
+                if score > 0
+            ]
+            for rows, scores in hits
+        ]
+
+    def _query_vectors(
+        self, texts: Sequence[str], stored_rows: Sequence[int | None] | None
+    ) -> np.ndarray | None:
+        """依次尝试：矩阵中的已入库向量 → LRU 缓存 → 对剩余文本一次批量编码。"""
+
+        vectors: list[np.ndarray | None] = [None] * len(texts)
+        pending: dict[str, list[int]] = {}
+        for idx, text in enumerate(texts):
+            row = stored_rows[idx] if stored_rows is not None else None
+            if row is not None:
+                vectors[idx] = self._matrix[row]
+                self.stored_vector_hits += 1
+                continue
+            cached = self._query_cache.get(text)
+            if cached is not None:
+                vectors[idx] = cached
+                continue
+            pending.setdefault(text, []).append(idx)
+
+        if pending:
+            fresh = self._encode_texts(list(pending))
+            if fresh is None:
+                return None
+            for (text, positions), vector in zip(pending.items(), fresh):
+                vector = vector.copy()
+                self._query_cache.put(text, vector)
+                for idx in positions:
+                    vectors[idx] = vector
+        return np.stack(vectors).astype(np.float32, copy=False)
+
+    def _stored_row(self, recipe: RecipeLike, text: str) -> int | None:
+        """菜谱已入库且 prompt 文本一致时，返回其向量所在行。"""
+
+        row = self._recipes.row_of(recipe.recipe_id)
+        if row is None:
+            return None
+        if isinstance(recipe, RecipeView) and recipe.store is self._recipes:
+            return row
+        return row if self._recipes.view(row).as_prompt_chunk() == text else None
+
+    def _exclude_rows(self, exclude: Sequence[str] | None) -> list[int]:
+        rows = (self._recipes.row_of(recipe_id) for recipe_id in exclude or ())
+        return [row for row in rows if row is not None]
+
+    def _exact_search_batch(
+        self,
+        vectors: np.ndarray,
+        top_k: int,
+        exclude_rows: Sequence[Sequence[int]],
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        total = len(self._recipes)
+        top_k = min(top_k, total)
+        if top_k <= 0:
+            empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+            return [empty for _ in range(len(vectors))]
+
+        # 按得分矩阵的元素预算分块，避免大语料下一次性分配 Q×N 的矩阵
+        block = max(1, self.SCORE_BLOCK_ELEMENTS // max(total, 1))
+        hits: list[tuple[np.ndarray, np.ndarray]] = []
+        for start in range(0, len(vectors), block):
+            block_vectors = vectors[start : start + block]
+            block_excludes = exclude_rows[start : start + block]
+            if self._quantized is not None:
+                hits.extend(
+                    self._quantized.search_batch(
+                        block_vectors,
+                        top_k,
+                        block_excludes,
+                        self._matrix,
+                        self.rescore_factor,
+                    )
+                )
+                continue
+            scores = block_vectors @ self._matrix.T
+            for offset, rows in enumerate(block_excludes):
+                scores[offset, list(rows)] = -1.0
+            top = np.argpartition(scores, -top_k, axis=1)[:, -top_k:]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(top_scores, axis=1)[:, ::-1]
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+            hits.extend(zip(top, top_scores))
+        return hits
+
+    def _load_or_train_ann(self, matrix: np.ndarray) -> IVFIndex:
+        """向量未变化时复用磁盘上的 IVF 索引，否则重新训练并写回。"""
+
+        if self._cache is None:
+            return IVFIndex.train(matrix, self.ann_lists, n_probe=self.ann_probe)
+        path = self._cache.directory / self.ANN_FILE
+        fingerprint = IVFIndex.fingerprint(matrix, self.ann_lists)
+        index = IVFIndex.load(path, matrix, fingerprint, n_probe=self.ann_probe)
+        if index is None:
+            index = IVFIndex.train(matrix, self.ann_lists, n_probe=self.ann_probe)
+            index.save(path, fingerprint)
+        return index
+
     def _ready(self) -> bool:
         return (
             self._enabled
-            and self._model is not None
             and self._matrix is not None
-            and len(self._ids) == len(self._matrix)
+            and len(self._recipes) == len(self._matrix)
         )
 
     def _ensure_model(self) -> None:
         if self._model or not self._enabled:
             return
-        try:
-            self._model = SentenceTransformer(self.model_name)
-        except Exception as exc:  # pragma: no cover - 依赖外部模型
-            LOGGER.warning(
-                "加载 SentenceTransformer(%s) 失败: %s", self.model_name, exc
-            )
-            self._enabled = False
+        # 服务的多个工作线程可能同时遇到首个缓存未命中，只加载一次模型
+        with self._model_lock:
+            if self._model or not self._enabled:
+                return
+            module = optional_module("sentence_transformers")
+            if module is None:
+                self._enabled = False
+                return
+            try:
+                self._model = module.SentenceTransformer(self.model_name)
+            except Exception as exc:  # pragma: no cover - 依赖外部模型
+                LOGGER.warning(
+                    "加载 SentenceTransformer(%s) 失败: %s", self.model_name, exc
+                )
+                self._enabled = False
 
-    def _encode_text(self, text: str) -> np.ndarray | None:
+    def _encode_batch(self, texts: list[str]) -> np.ndarray:
+        """编码一批文本，必要时先加载模型；也是磁盘缓存未命中时的回调。"""
+
+        self._ensure_model()
+        if not self._model:
+            raise RuntimeError(f"无法加载向量模型 {self.model_name}")
+        return self._model.encode(
+            texts,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+
+    def _encode_texts(self, texts: list[str]) -> np.ndarray | None:
+        self._ensure_model()
         if not self._model:
             return None
         try:
-            vector = self._model.encode(
-                text,
-                show_progress_bar=False,
-                convert_to_numpy=True,
-                normalize_embeddings=True,
-            )
+            vectors = self._encode_batch(texts)
         except Exception as exc:  # pragma: no cover
             LOGGER.warning("文本向量化失败: %s", exc)
             return None
-        return vector
+        return np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1)
 
 
 __all__ = ["RecipeEmbeddingIndex"]
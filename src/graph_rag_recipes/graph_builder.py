@@ -2,24 +2,106 @@
 
 from __future__ import annotations
 
+import logging
+import math
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from itertools import combinations
-from typing import Iterable
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Sequence
 
 import networkx as nx
+import numpy as np
 
 from .data_models import RecipeRecord
+from .lazy_imports import optional_module
+from .recipe_store import RecipeStore, RecipeView
+
+if TYPE_CHECKING:
+    from scipy import sparse
+
+LOGGER = logging.getLogger(__name__)
+
+EdgeTriple = tuple[int, int, float]
+# 上界与真实得分的运算顺序不同，预留舍入误差，避免误剪恰好等于阈值的边
+_BOUND_EPSILON = 1e-9
+# 食材 Jaccard、食材重叠系数、标签 Jaccard 三项的默认权重
+DEFAULT_SIMILARITY_WEIGHTS = (0.6, 0.3, 0.1)
+# 每个进程大约分到的分片数，分片越多负载越均衡（靠前的行候选更多）
+_SHARDS_PER_WORKER = 8
+
+
+@dataclass(slots=True)
+class _FeatureIndex:
+    """打分所需的预处理结构，按引擎类型只构建需要的部分。"""
+
+    ingredient_sets: list[frozenset[str]]
+    tag_sets: list[frozenset[str]]
+    ingredient_postings: dict[str, list[int]] | None = None
+    tag_postings: dict[str, list[int]] | None = None
+    ingredient_matrix: Any = None
+    tag_matrix: Any = None
 
 
 class RecipeGraphBuilder:
-    """根据共享食材/标签构建图结构，并写入相似度权重。"""
+    """根据共享食材/标签构建图结构，并写入相似度权重。
 
-    def __init__(self, similarity_threshold: float = 0.35) -> None:
+    ``engine`` 控制候选边的生成方式：
+
+    - ``"indexed"``（默认）：基于食材/标签倒排表，只对至少共享一个特征的菜谱对打分；
+    - ``"sparse"``：将菜谱编码为稀疏关联矩阵，按行块做矩阵乘法批量求交集，
+      ``block_size`` 控制每块行数以限制峰值内存（需要 scipy）；
+    - ``"pairwise"``：逐对枚举全部组合，仅用于对照验证。
+
+    ``workers`` 大于 1 时，``indexed``/``sparse`` 引擎会把行区间切成分片交给进程池，
+    再按分片顺序合并边列表，因此结果与单进程构建完全一致。
+    """
+
+    ENGINES = ("indexed", "sparse", "pairwise")
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.35,
+        engine: str = "indexed",
+        block_size: int = 1024,
+        workers: int = 1,
+        weights: Sequence[float] = DEFAULT_SIMILARITY_WEIGHTS,
+    ) -> None:
+        if engine not in self.ENGINES:
+            raise ValueError(f"未知的图构建引擎: {engine}")
+        if block_size <= 0:
+            raise ValueError("block_size 必须为正整数")
+        if len(weights) != 3 or any(weight < 0 for weight in weights):
+            raise ValueError(
+                "weights 需为三个非负数：食材 Jaccard、食材重叠系数、标签 Jaccard"
+            )
+        # scipy 只有稀疏引擎用到，推迟到选择该引擎时再导入
+        if engine == "sparse" and optional_module("scipy.sparse") is None:
+            LOGGER.warning("未安装 scipy，稀疏矩阵引擎回退为倒排表引擎。")
+            engine = "indexed"
         self.similarity_threshold = similarity_threshold
+        self.engine = engine
+        self.block_size = block_size
+        self.workers = max(1, workers)
+        self.weights = tuple(float(weight) for weight in weights)
+
+    def build_graph(self, recipes: Iterable[RecipeRecord] | RecipeStore) -> nx.Graph:
+        """传入 :class:`RecipeStore` 时，节点只记录行号，菜谱字段留在存储中。"""
 
-    def build_graph(self, recipes: Iterable[RecipeRecord]) -> nx.Graph:
         recipe_list = list(recipes)
+        return self.assemble_graph(recipe_list, self._iter_edges(recipe_list))
+
+    @staticmethod
+    def assemble_graph(
+        recipe_list: Sequence[RecipeRecord | RecipeView], edges: Iterable[EdgeTriple]
+    ) -> nx.Graph:
+        """按菜谱顺序写入节点，再按给定顺序写入以下标表示的加权边。"""
+
         graph = nx.Graph()
         for recipe in recipe_list:
+            if isinstance(recipe, RecipeView):
+                graph.add_node(recipe.recipe_id, row=recipe.row)
+                continue
             graph.add_node(
                 recipe.recipe_id,
                 title=recipe.title,
@@ -28,14 +110,378 @@ class RecipeGraphBuilder:
                 instructions=recipe.instructions,
             )
 
-        for left, right in combinations(recipe_list, 2):
-            score = self._compute_similarity(left, right)
-            if score >= self.similarity_threshold:
-                graph.add_edge(left.recipe_id, right.recipe_id, weight=score)
+        for left_idx, right_idx, score in edges:
+            graph.add_edge(
+                recipe_list[left_idx].recipe_id,
+                recipe_list[right_idx].recipe_id,
+                weight=score,
+            )
         return graph
 
+    # ------------------------------------------------------------------ 候选边生成
+    def _iter_edges(self, recipe_list: Sequence[RecipeRecord]) -> Iterator[EdgeTriple]:
+        # 阈值不为正时，不共享任何特征的菜谱对（得分 0）也应连边，倒排表无法覆盖
+        if self.engine == "pairwise" or self.similarity_threshold <= 0:
+            return self._iter_pairwise_edges(recipe_list)
+
+        ingredient_sets, tag_sets = self._feature_sets(recipe_list)
+        shards = self._shard_bounds(len(recipe_list))
+        if self.workers > 1 and len(shards) > 1:
+            return self._iter_parallel_edges(ingredient_sets, tag_sets, shards)
+        index = self._index_features(ingredient_sets, tag_sets)
+        return self._iter_row_edges(index, 0, len(recipe_list))
+
     @staticmethod
-    def _compute_similarity(left: RecipeRecord, right: RecipeRecord) -> float:
+    def _feature_sets(
+        recipe_list: Sequence[RecipeRecord | RecipeView],
+    ) -> tuple[list[frozenset], list[frozenset]]:
+        """存储视图直接使用驻留后的词表 ID，避免重新物化字符串元组。"""
+
+        ingredient_sets: list[frozenset] = []
+        tag_sets: list[frozenset] = []
+        for recipe in recipe_list:
+            if isinstance(recipe, RecipeView):
+                ingredient_sets.append(
+                    frozenset(recipe.store.ingredient_codes(recipe.row))
+                )
+                tag_sets.append(frozenset(recipe.store.tag_codes(recipe.row)))
+            else:
+                ingredient_sets.append(frozenset(recipe.ingredients))
+                tag_sets.append(frozenset(recipe.tags))
+        return ingredient_sets, tag_sets
+
+    def _shard_bounds(self, total: int) -> list[tuple[int, int]]:
+        shard_size = max(
+            1,
+            min(
+                self.block_size, math.ceil(total / (self.workers * _SHARDS_PER_WORKER))
+            ),
+        )
+        return [
+            (start, min(start + shard_size, total))
+            for start in range(0, total, shard_size)
+        ]
+
+    def _iter_parallel_edges(
+        self,
+        ingredient_sets: list[frozenset[str]],
+        tag_sets: list[frozenset[str]],
+        shards: Sequence[tuple[int, int]],
+    ) -> Iterator[EdgeTriple]:
+        """多进程分片打分；``map`` 按提交顺序返回，合并顺序与进程数无关。"""
+
+        with ProcessPoolExecutor(
+            max_workers=min(self.workers, len(shards)),
+            initializer=_init_shard_worker,
+            initargs=(
+                self.similarity_threshold,
+                self.engine,
+                self.block_size,
+                self.weights,
+                ingredient_sets,
+                tag_sets,
+            ),
+        ) as executor:
+            for left, right, scores in executor.map(_score_shard, shards):
+                yield from zip(left.tolist(), right.tolist(), scores.tolist())
+
+    def _index_features(
+        self, ingredient_sets: list[frozenset[str]], tag_sets: list[frozenset[str]]
+    ) -> _FeatureIndex:
+        index = _FeatureIndex(ingredient_sets=ingredient_sets, tag_sets=tag_sets)
+        if self.engine == "sparse":
+            index.ingredient_matrix = self._incidence_matrix(ingredient_sets)
+            index.tag_matrix = self._incidence_matrix(tag_sets)
+        else:
+            index.ingredient_postings = self._build_postings(ingredient_sets)
+            index.tag_postings = self._build_postings(tag_sets)
+        return index
+
+    def _iter_row_edges(
+        self, index: _FeatureIndex, start: int, stop: int
+    ) -> Iterator[EdgeTriple]:
+        """为左端点落在 ``[start, stop)`` 的菜谱对打分。"""
+
+        if self.engine == "sparse":
+            return self._iter_sparse_edges(index, start, stop)
+        return self._iter_indexed_edges(index, start, stop)
+
+    def _iter_pairwise_edges(
+        self, recipe_list: Sequence[RecipeRecord]
+    ) -> Iterator[EdgeTriple]:
+        for left_idx, right_idx in combinations(range(len(recipe_list)), 2):
+            score = self._compute_similarity(
+                recipe_list[left_idx], recipe_list[right_idx]
+            )
+            if score >= self.similarity_threshold:
+                yield left_idx, right_idx, score
+
+    def _iter_indexed_edges(
+        self, index: _FeatureIndex, start: int, stop: int
+    ) -> Iterator[EdgeTriple]:
+        """倒排表候选生成：按 (左, 右) 下标升序产出，与逐对枚举的加边顺序一致。"""
+
+        ingredient_sets = index.ingredient_sets
+        tag_sets = index.tag_sets
+        threshold = self.similarity_threshold
+        # 仅共享标签的菜谱对最高得分为标签权重，阈值更高时无需沿标签倒排表扩展候选
+        tag_only_reachable = threshold <= self.weights[2] + _BOUND_EPSILON
+
+        for left_idx in range(start, stop):
+            left_ingredients = ingredient_sets[left_idx]
+            left_tags = tag_sets[left_idx]
+            shared_ingredients = self._count_shared(
+                left_idx, left_ingredients, index.ingredient_postings
+            )
+            shared_tags = (
+                self._count_shared(left_idx, left_tags, index.tag_postings)
+                if tag_only_reachable
+                else None
+            )
+            candidates = (
+                shared_ingredients.keys() | shared_tags.keys()
+                if shared_tags
+                else shared_ingredients.keys()
+            )
+            if not candidates:
+                continue
+
+            left_ing_size = len(left_ingredients)
+            left_tag_size = len(left_tags)
+            for right_idx in sorted(candidates):
+                right_tags = tag_sets[right_idx]
+                right_ing_size = len(ingredient_sets[right_idx])
+                right_tag_size = len(right_tags)
+                # 先用集合大小给出得分上界，无法达到阈值的菜谱对直接跳过
+                if (
+                    self._score_upper_bound(
+                        left_ing_size, right_ing_size, left_tag_size, right_tag_size
+                    )
+                    < threshold - _BOUND_EPSILON
+                ):
+                    continue
+                shared_tag_count = (
+                    shared_tags.get(right_idx, 0)
+                    if shared_tags is not None
+                    else len(left_tags & right_tags)
+                )
+                score = self._score_from_counts(
+                    shared_ingredients.get(right_idx, 0),
+                    left_ing_size,
+                    right_ing_size,
+                    shared_tag_count,
+                    left_tag_size,
+                    right_tag_size,
+                )
+                if score >= threshold:
+                    yield left_idx, right_idx, score
+
+    def _iter_sparse_edges(
+        self, index: _FeatureIndex, start: int, stop: int
+    ) -> Iterator[EdgeTriple]:
+        """稀疏矩阵批量打分：每个行块与其后的全部菜谱做一次矩阵乘法。"""
+
+        ingredients = index.ingredient_matrix
+        tags = index.tag_matrix
+        ingredient_sizes = np.diff(ingredients.indptr)
+        tag_sizes = np.diff(tags.indptr)
+        threshold = self.similarity_threshold
+        tag_only_reachable = threshold <= self.weights[2] + _BOUND_EPSILON
+        total = ingredients.shape[0]
+
+        for block_start in range(start, stop, self.block_size):
+            block_stop = min(block_start + self.block_size, stop)
+            # 列从 block_start 开始即可覆盖所有 right > left 的组合，块内下三角随后被掩码过滤
+            ing_keys, ing_counts = self._block_intersections(
+                ingredients, block_start, block_stop
+            )
+            if tag_only_reachable:
+                tag_keys, tag_counts = self._block_intersections(
+                    tags, block_start, block_stop
+                )
+                keys = np.union1d(ing_keys, tag_keys)
+            else:
+                keys = ing_keys
+
+            width = total - block_start
+            left = keys // width + block_start
+            right = keys % width + block_start
+            upper = right > left
+            keys, left, right = keys[upper], left[upper], right[upper]
+            if not len(keys):
+                continue
+
+            shared_ing = self._lookup_counts(keys, ing_keys, ing_counts)
+            if tag_only_reachable:
+                shared_tag = self._lookup_counts(keys, tag_keys, tag_counts)
+            else:
+                # 只对食材候选对求标签交集：所有菜谱共享的分类标签（如 dishes）会让
+                # 块×N 的标签乘积变成稠密矩阵
+                shared_tag = self._pair_intersections(tags, left, right)
+            scores = self._score_arrays(
+                shared_ing,
+                ingredient_sizes[left],
+                ingredient_sizes[right],
+                shared_tag,
+                tag_sizes[left],
+                tag_sizes[right],
+            )
+            passed = scores >= threshold
+            yield from zip(
+                left[passed].tolist(), right[passed].tolist(), scores[passed].tolist()
+            )
+
+    @staticmethod
+    def _incidence_matrix(
+        feature_sets: Sequence[frozenset[str]],
+    ) -> sparse.csr_matrix:
+        vocabulary: dict[str, int] = {}
+        indptr = [0]
+        indices: list[int] = []
+        for features in feature_sets:
+            indices.extend(
+                vocabulary.setdefault(feature, len(vocabulary)) for feature in features
+            )
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.int32)
+        return optional_module("scipy.sparse").csr_matrix(
+            (data, np.asarray(indices, dtype=np.int64), np.asarray(indptr)),
+            shape=(len(feature_sets), max(len(vocabulary), 1)),
+        )
+
+    @staticmethod
+    def _block_intersections(
+        matrix: sparse.csr_matrix, start: int, stop: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """返回行块交集计数的行优先线性键（升序）与对应计数。"""
+
+        product = (matrix[start:stop] @ matrix[start:].T).tocoo()
+        width = matrix.shape[0] - start
+        keys = product.row.astype(np.int64) * width + product.col
+        order = np.argsort(keys, kind="stable")
+        return keys[order], product.data[order].astype(np.int64)
+
+    @staticmethod
+    def _pair_intersections(
+        matrix: sparse.csr_matrix, left: np.ndarray, right: np.ndarray
+    ) -> np.ndarray:
+        """逐对计算 ``left[i]`` 与 ``right[i]`` 两行的交集大小。"""
+
+        if not len(left):
+            return np.zeros(0, dtype=np.int64)
+        overlap = matrix[left].multiply(matrix[right]).sum(axis=1)
+        return np.asarray(overlap, dtype=np.int64).ravel()
+
+    @staticmethod
+    def _lookup_counts(
+        keys: np.ndarray, source_keys: np.ndarray, source_counts: np.ndarray
+    ) -> np.ndarray:
+        if not len(source_keys):
+            return np.zeros(len(keys), dtype=np.int64)
+        positions = np.searchsorted(source_keys, keys)
+        positions = np.minimum(positions, len(source_keys) - 1)
+        found = source_keys[positions] == keys
+        return np.where(found, source_counts[positions], 0)
+
+    def _score_arrays(
+        self,
+        shared_ing: np.ndarray,
+        left_ing: np.ndarray,
+        right_ing: np.ndarray,
+        shared_tag: np.ndarray,
+        left_tag: np.ndarray,
+        right_tag: np.ndarray,
+    ) -> np.ndarray:
+        """``_score_from_counts`` 的向量化版本，逐元素运算顺序保持一致。"""
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ingredient_union = left_ing + right_ing - shared_ing
+            ingredient_jaccard = np.where(
+                ingredient_union > 0, shared_ing / ingredient_union, 0.0
+            )
+            ingredient_min = np.minimum(left_ing, right_ing)
+            ingredient_overlap = np.where(
+                ingredient_min > 0, shared_ing / ingredient_min, 0.0
+            )
+            tag_union = left_tag + right_tag - shared_tag
+            tag_jaccard = np.where(tag_union > 0, shared_tag / tag_union, 0.0)
+
+        jaccard_weight, overlap_weight, tag_weight = self.weights
+        return (
+            jaccard_weight * ingredient_jaccard
+            + overlap_weight * ingredient_overlap
+            + tag_weight * tag_jaccard
+        )
+
+    @staticmethod
+    def _build_postings(feature_sets: Sequence[frozenset[str]]) -> dict[str, list[int]]:
+        postings: dict[str, list[int]] = {}
+        for idx, features in enumerate(feature_sets):
+            for feature in features:
+                postings.setdefault(feature, []).append(idx)
+        return postings
+
+    @staticmethod
+    def _count_shared(
+        left_idx: int, features: frozenset[str], postings: dict[str, list[int]]
+    ) -> dict[int, int]:
+        """统计下标大于 ``left_idx`` 的菜谱与其共享的特征数量。"""
+
+        counts: dict[int, int] = {}
+        for feature in features:
+            posting = postings[feature]
+            for right_idx in posting[bisect_right(posting, left_idx) :]:
+                counts[right_idx] = counts.get(right_idx, 0) + 1
+        return counts
+
+    def _score_upper_bound(
+        self, left_ing: int, right_ing: int, left_tag: int, right_tag: int
+    ) -> float:
+        jaccard_weight, overlap_weight, tag_weight = self.weights
+        ingredient_bound = (
+            0.0
+            if not left_ing or not right_ing
+            else jaccard_weight * min(left_ing, right_ing) / max(left_ing, right_ing)
+            + overlap_weight
+        )
+        tag_bound = (
+            0.0
+            if not left_tag or not right_tag
+            else tag_weight * min(left_tag, right_tag) / max(left_tag, right_tag)
+        )
+        return ingredient_bound + tag_bound
+
+    def _score_from_counts(
+        self,
+        shared_ing: int,
+        left_ing: int,
+        right_ing: int,
+        shared_tag: int,
+        left_tag: int,
+        right_tag: int,
+    ) -> float:
+        """与 ``_compute_similarity`` 采用相同的运算顺序，保证浮点结果逐位一致。"""
+
+        ingredient_union = left_ing + right_ing - shared_ing
+        ingredient_jaccard = (
+            0.0 if not ingredient_union else shared_ing / ingredient_union
+        )
+        ingredient_overlap = (
+            0.0
+            if not left_ing or not right_ing
+            else shared_ing / min(left_ing, right_ing)
+        )
+        tag_union = left_tag + right_tag - shared_tag
+        tag_jaccard = 0.0 if not tag_union else shared_tag / tag_union
+
+        jaccard_weight, overlap_weight, tag_weight = self.weights
+        return (
+            jaccard_weight * ingredient_jaccard
+            + overlap_weight * ingredient_overlap
+            + tag_weight * tag_jaccard
+        )
+
+    def _compute_similarity(self, left: RecipeRecord, right: RecipeRecord) -> float:
         ingredients_left = set(left.ingredients)
         ingredients_right = set(right.ingredients)
         tags_left = set(left.tags)
@@ -54,7 +500,49 @@ class RecipeGraphBuilder:
         )
         tag_jaccard = safe_jaccard(tags_left, tags_right)
 
-        return 0.6 * ingredient_jaccard + 0.3 * ingredient_overlap + 0.1 * tag_jaccard
+        jaccard_weight, overlap_weight, tag_weight = self.weights
+        return (
+            jaccard_weight * ingredient_jaccard
+            + overlap_weight * ingredient_overlap
+            + tag_weight * tag_jaccard
+        )
+
+
+# ---------------------------------------------------------------------- 进程池分片
+_SHARD_CONTEXT: tuple[RecipeGraphBuilder, _FeatureIndex] | None = None
+
+
+def _init_shard_worker(
+    similarity_threshold: float,
+    engine: str,
+    block_size: int,
+    weights: tuple[float, float, float],
+    ingredient_sets: list[frozenset[str]],
+    tag_sets: list[frozenset[str]],
+) -> None:
+    """每个子进程只构建一次倒排表/关联矩阵，之后的分片复用。"""
+
+    global _SHARD_CONTEXT
+    builder = RecipeGraphBuilder(
+        similarity_threshold, engine, block_size, weights=weights
+    )
+    _SHARD_CONTEXT = (builder, builder._index_features(ingredient_sets, tag_sets))
+
+
+def _score_shard(bounds: tuple[int, int]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    if _SHARD_CONTEXT is None:
+        raise RuntimeError("分片进程尚未初始化")
+    builder, index = _SHARD_CONTEXT
+    edges = list(builder._iter_row_edges(index, *bounds))
+    if not edges:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0, dtype=np.float64)
+    left, right, scores = zip(*edges)
+    return (
+        np.asarray(left, dtype=np.int64),
+        np.asarray(right, dtype=np.int64),
+        np.asarray(scores, dtype=np.float64),
+    )
 
 
-__all__ = ["RecipeGraphBuilder"]
+__all__ = ["DEFAULT_SIMILARITY_WEIGHTS", "RecipeGraphBuilder"]
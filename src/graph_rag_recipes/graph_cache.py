@@ -0,0 +1,110 @@
+"""以数据集指纹为键的图快照缓存，避免每次启动都重新构建图。"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Sequence
+
+import networkx as nx
+import numpy as np
+
+from .data_models import RecipeRecord
+from .graph_builder import RecipeGraphBuilder
+from .recipe_store import RecipeView
+
+LOGGER = logging.getLogger(__name__)
+
+
+class GraphSnapshotCache:
+    """将图的边列表以 ``.npz`` 二进制格式保存在 processed 目录。
+
+    快照只保存节点 ID 与 (左下标, 右下标, 权重) 三列数组，节点属性仍由菜谱记录
+    写回，因此文件紧凑且加载时无需反序列化 Python 对象。
+    """
+
+    SNAPSHOT_FILE = "graph_snapshot.npz"
+    FORMAT_VERSION = 1
+
+    def __init__(self, directory: Path) -> None:
+        self.path = directory / self.SNAPSHOT_FILE
+
+    @classmethod
+    def fingerprint(
+        cls,
+        sources: Sequence[Path],
+        similarity_threshold: float,
+        weights: Sequence[float],
+    ) -> str:
+        """数据文件内容与相似度参数共同决定图结构，任一变化都会使快照失效。"""
+
+        digest = hashlib.sha256()
+        digest.update(f"v{cls.FORMAT_VERSION}".encode())
+        for source in sources:
+            digest.update(source.name.encode("utf-8"))
+            if source.exists():
+                with source.open("rb") as fh:
+                    for chunk in iter(lambda: fh.read(1 << 20), b""):
+                        digest.update(chunk)
+            else:
+                digest.update(b"<missing>")
+        digest.update(repr(float(similarity_threshold)).encode())
+        digest.update(repr(tuple(float(w) for w in weights)).encode())
+        return digest.hexdigest()
+
+    def load(
+        self, fingerprint: str, records: Sequence[RecipeRecord | RecipeView]
+    ) -> nx.Graph | None:
+        if not self.path.exists():
+            return None
+        try:
+            with np.load(self.path, allow_pickle=False) as payload:
+                if str(payload["fingerprint"]) != fingerprint:
+                    return None
+                node_ids = payload["node_ids"].tolist()
+                left = payload["left"]
+                right = payload["right"]
+                weights = payload["weights"]
+        except (OSError, KeyError, ValueError) as exc:
+            LOGGER.warning("读取图快照失败，将重新构建: %s", exc)
+            return None
+
+        if node_ids != [record.recipe_id for record in records]:
+            return None
+        edges = zip(left.tolist(), right.tolist(), weights.tolist())
+        return RecipeGraphBuilder.assemble_graph(records, edges)
+
+    def save(
+        self,
+        fingerprint: str,
+        graph: nx.Graph,
+        records: Sequence[RecipeRecord | RecipeView],
+    ) -> None:
+        """``graph.edges()`` 的遍历顺序即加边顺序，重新加载后邻接顺序保持不变。"""
+
+        index = {record.recipe_id: idx for idx, record in enumerate(records)}
+        edges = list(graph.edges(data="weight"))
+        left = np.fromiter((index[u] for u, _, _ in edges), np.int32, len(edges))
+        right = np.fromiter((index[v] for _, v, _ in edges), np.int32, len(edges))
+        weights = np.fromiter((w for _, _, w in edges), np.float64, len(edges))
+
+        tmp_path = self.path.with_suffix(".tmp")
+        try:
+            with tmp_path.open("wb") as fh:
+                np.savez(
+                    fh,
+                    fingerprint=np.asarray(fingerprint),
+                    node_ids=np.asarray([record.recipe_id for record in records]),
+                    left=left,
+                    right=right,
+                    weights=weights,
+                )
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            LOGGER.warning("写入图快照失败: %s", exc)
+            tmp_path.unlink(missing_ok=True)
+
+
+__all__ = ["GraphSnapshotCache"]
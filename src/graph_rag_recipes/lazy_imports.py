@@ -0,0 +1,27 @@
+"""按需导入重量级可选依赖，缩短包与命令行的启动时间。"""
+
+from __future__ import annotations
+
+import importlib
+import importlib.util
+from functools import cache
+from types import ModuleType
+
+
+@cache
+def optional_module(name: str) -> ModuleType | None:
+    """首次调用时导入模块，未安装时返回 ``None``；结果按模块名缓存。"""
+
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def module_available(name: str) -> bool:
+    """只查找顶层包而不执行导入，用于在不付出导入代价的前提下判断依赖是否存在。"""
+
+    return importlib.util.find_spec(name) is not None
+
+
+__all__ = ["module_available", "optional_module"]
@@ -0,0 +1,135 @@
+"""基于 SQLite 的 LLM 响应持久化缓存。"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from .lru import CacheStats
+
+LOGGER = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """以 (模型名, prompt 哈希) 为键缓存 LLM 输出。
+
+    条目超过 ``ttl_seconds`` 即视为过期；条目数超过 ``max_entries`` 时按最近访问
+    时间淘汰最旧的记录。数据库启用 WAL 模式，多个进程可以共享同一个缓存文件。
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_entries: int = 10000,
+    ) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # WAL 下 NORMAL 只在检查点时落盘，命中路径的访问时间更新不再等待 fsync
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " model TEXT NOT NULL,"
+                " response TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed"
+                " ON responses (accessed_at)"
+            )
+
+    @staticmethod
+    def cache_key(model: str, prompt: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(model.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, model: str, prompt: str) -> str | None:
+        key = self.cache_key(model, prompt)
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                row = self._conn.execute(
+                    "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or now - row[1] > self.ttl_seconds:
+                    if row is not None:
+                        self._conn.execute(
+                            "DELETE FROM responses WHERE key = ?", (key,)
+                        )
+                    self._misses += 1
+                    return None
+                self._conn.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+                self._hits += 1
+                return row[0]
+        except sqlite3.Error as exc:
+            LOGGER.warning("读取 LLM 缓存失败: %s", exc)
+            return None
+
+    def put(self, model: str, prompt: str, response: str) -> None:
+        key = self.cache_key(model, prompt)
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses"
+                    " (key, model, response, created_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, model, response, now, now),
+                )
+                self._evict(now)
+        except sqlite3.Error as exc:
+            LOGGER.warning("写入 LLM 缓存失败: %s", exc)
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+            self._hits = 0
+            self._misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self) -> CacheStats:
+        # 计数与条目数在同一把锁内读取，服务的工作线程同时读写时快照保持一致
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return CacheStats(self._hits, self._misses, self.max_entries, size)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------ 内部方法
+    def _evict(self, now: float) -> None:
+        self._conn.execute(
+            "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+        )
+        self._conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            " SELECT key FROM responses ORDER BY accessed_at DESC"
+            " LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+
+__all__ = ["LLMResponseCache"]
@@ -2,24 +2,89 @@
 
 from __future__ import annotations
 
-from typing import Sequence
+import asyncio
+import logging
+import random
+from functools import cache
+from typing import Any, Awaitable, Callable, Iterator, Sequence
 
 from .config import ProjectConfig
 from .data_models import RecipeRecord
+from .lazy_imports import module_available, optional_module
+from .llm_cache import LLMResponseCache
+from .prompt_builder import PromptBuilder, PromptStats, make_token_counter
 
-try:
-    from openai import OpenAI
-except ImportError:  # pragma: no cover - 仅在未安装 openai 时触发
-    OpenAI = None  # type: ignore
+LOGGER = logging.getLogger(__name__)
+
+
+@cache
+def _retryable_errors() -> tuple[type[BaseException], ...]:
+    """超时、连接失败、限流与服务端错误可以重试；参数或鉴权错误重试无意义。"""
+
+    errors: list[type[BaseException]] = [asyncio.TimeoutError]
+    openai = optional_module("openai")
+    if openai is not None:
+        errors.extend(
+            (
+                openai.APIConnectionError,
+                openai.APITimeoutError,
+                openai.RateLimitError,
+                openai.InternalServerError,
+            )
+        )
+    return tuple(errors)
 
 
 class LLMGenerator:
-    def __init__(self, config: ProjectConfig | None = None) -> None:
+    """生成推荐理由。
+
+    ``client`` 可注入任何实现 ``responses.create(model=..., input=...)`` 的对象，便于
+    使用本地桩替代真实 API；``cache`` 未显式传入时按配置在 processed 目录下创建
+    SQLite 响应缓存，相同模型与 prompt 的重复请求直接命中缓存。
+
+    :meth:`agenerate` 基于 ``AsyncOpenAI`` 与共享连接池，并发数由
+    ``llm_max_concurrency`` 信号量限制，单次请求超过 ``llm_timeout`` 秒即取消，
+    可重试错误按指数退避最多重试 ``llm_max_retries`` 次。
+
+    prompt 由 :class:`PromptBuilder` 按 ``llm_prompt_token_budget`` 压缩，最近一次
+    构建的规模记录在 ``last_prompt_stats``。
+
+    openai SDK 导入较慢，客户端推迟到第一次缓存未命中、真正需要请求时才创建。
+    """
+
+    CACHE_FILE = "llm_cache.sqlite3"
+
+    def __init__(
+        self,
+        config: ProjectConfig | None = None,
+        client: Any | None = None,
+        cache: LLMResponseCache | None = None,
+        async_client: Any | None = None,
+    ) -> None:
         self.config = config or ProjectConfig()
-        self._client = None
-        api_key = self.config.llm_api_key()
-        if OpenAI and api_key:
-            self._client = OpenAI(api_key=api_key)
+        self._client = client
+        self._client_pending = (
+            client is None
+            and bool(self.config.llm_api_key())
+            and module_available("openai")
+        )
+        self._async_client = async_client
+        self._owns_async_client = async_client is None
+        self._async_loop: asyncio.AbstractEventLoop | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self.prompt_builder = PromptBuilder(
+            token_budget=self.config.llm_prompt_token_budget,
+            instruction_chars=self.config.llm_prompt_instruction_chars,
+            counter=make_token_counter(self.config.models.llm_model),
+        )
+        self.last_prompt_stats: PromptStats | None = None
+        self.cache = cache
+        if self.cache is None and self._has_client() and self.config.llm_cache_enabled:
+            self.cache = LLMResponseCache(
+                self.config.paths.processed_data_dir / self.CACHE_FILE,
+                ttl_seconds=self.config.llm_cache_ttl,
+                max_entries=self.config.llm_cache_max_entries,
+            )
 
     def build_prompt(
         self,
@@ -27,16 +92,17 @@ class LLMGenerator:
         candidates: Sequence[RecipeRecord],
         user_input: str,
     ) -> str:
-        parts = [
-            "你是一名善于解释口味风格的智能厨房助手。",
-            f"用户输入: {user_input}",
-            "参考菜谱:",
-            reference.as_prompt_chunk(),
-            "候选菜谱:",
-        ]
-        parts.extend(recipe.as_prompt_chunk() for recipe in candidates)
-        parts.append("请用中文生成推荐理由，突出共同食材或口味，并给出建议。")
-        return "\n\n".join(parts)
+        prompt = self.prompt_builder.build(reference, candidates, user_input)
+        stats = self.last_prompt_stats = prompt.stats
+        LOGGER.debug(
+            "prompt %d tokens（预算 %d），细节 %s，候选 %d 条（舍弃 %d 条）",
+            stats.tokens,
+            stats.budget,
+            stats.detail,
+            stats.candidates,
+            stats.dropped_candidates,
+        )
+        return prompt.text
 
     def generate(
         self,
@@ -45,14 +111,206 @@ class LLMGenerator:
         user_input: str,
     ) -> str:
         prompt = self.build_prompt(reference, candidates, user_input)
-        if not self._client:
+        if not self._has_client():
             return self._fallback_reason(reference, candidates)
 
-        response = self._client.responses.create(
+        cache_model = self._cache_model()
+        if self.cache is not None:
+            cached = self.cache.get(cache_model, prompt)
+            if cached is not None:
+                return cached
+
+        response = self._sync_client().responses.create(
             model=self.config.models.llm_model,
             input=prompt,
         )
-        return response.output[0].content[0].text  # type: ignore[return-value]
+        text = response.output[0].content[0].text
+        if self.cache is not None:
+            self.cache.put(cache_model, prompt, text)
+        return text  # type: ignore[return-value]
+
+    def generate_stream(
+        self,
+        reference: RecipeRecord,
+        candidates: Sequence[RecipeRecord],
+        user_input: str,
+    ) -> Iterator[str]:
+        """流式版本的 :meth:`generate`，逐段产出文本增量。
+
+        缓存命中或未配置客户端时一次性产出完整文本；流式响应结束后整段写入缓存。
+        """
+
+        prompt = self.build_prompt(reference, candidates, user_input)
+        if not self._has_client():
+            yield self._fallback_reason(reference, candidates)
+            return
+
+        cache_model = self._cache_model()
+        if self.cache is not None:
+            cached = self.cache.get(cache_model, prompt)
+            if cached is not None:
+                yield cached
+                return
+
+        pieces: list[str] = []
+        stream = self._sync_client().responses.create(
+            model=self.config.models.llm_model,
+            input=prompt,
+            stream=True,
+        )
+        for event in stream:
+            if event.type == "response.output_text.delta" and event.delta:
+                pieces.append(event.delta)
+                yield event.delta
+        if self.cache is not None and pieces:
+            self.cache.put(cache_model, prompt, "".join(pieces))
+
+    def is_degraded(
+        self,
+        reference: RecipeRecord,
+        candidates: Sequence[RecipeRecord],
+        explanation: str,
+    ) -> bool:
+        """已配置客户端却得到模板理由，说明请求失败后降级，结果不宜长期缓存。"""
+
+        has_client = self._async_client is not None or self._has_client()
+        return has_client and explanation == self._fallback_reason(
+            reference, candidates
+        )
+
+    async def agenerate(
+        self,
+        reference: RecipeRecord,
+        candidates: Sequence[RecipeRecord],
+        user_input: str,
+    ) -> str:
+        """:meth:`generate` 的异步版本；重试耗尽时记录警告并返回模板理由。"""
+
+        prompt = self.build_prompt(reference, candidates, user_input)
+        if self._async_client is None and not self._has_client():
+            return self._fallback_reason(reference, candidates)
+
+        cache_model = self._cache_model()
+        if self.cache is not None:
+            cached = self.cache.get(cache_model, prompt)
+            if cached is not None:
+                return cached
+
+        request = await self._async_request(prompt)
+        if request is None:
+            return self._fallback_reason(reference, candidates)
+        try:
+            response = await self._with_retries(request)
+        except _retryable_errors() as exc:
+            LOGGER.warning(
+                "LLM 请求在 %d 次重试后仍失败: %r", self.config.llm_max_retries, exc
+            )
+            return self._fallback_reason(reference, candidates)
+        text = response.output[0].content[0].text
+        if self.cache is not None:
+            self.cache.put(cache_model, prompt, text)
+        return text  # type: ignore[return-value]
+
+    async def aclose(self) -> None:
+        """关闭自建的异步客户端及其连接池。"""
+
+        if self._owns_async_client and self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+            self._async_loop = None
+
+    # ------------------------------------------------------------------ 内部方法
+    async def _async_request(self, prompt: str) -> Callable[[], Awaitable[Any]] | None:
+        """返回发起一次请求的协程工厂；只有同步客户端时放到线程池中执行。"""
+
+        await self._bind_event_loop()
+        model = self.config.models.llm_model
+        if self._async_client is not None:
+            client = self._async_client
+            return lambda: client.responses.create(model=model, input=prompt)
+        if self._has_client():
+            client = self._sync_client()
+            return lambda: asyncio.to_thread(
+                client.responses.create, model=model, input=prompt
+            )
+        return None
+
+    async def _bind_event_loop(self) -> None:
+        """信号量与连接池都绑定事件循环，循环变化（如多次 asyncio.run）时重建。
+
+        自建的旧客户端在替换后立即关闭，避免每个事件循环遗留一个连接池。
+        """
+
+        loop = asyncio.get_running_loop()
+        if self._async_loop is loop:
+            return
+        self._async_loop = loop
+        self._semaphore = asyncio.Semaphore(self.config.llm_max_concurrency)
+        if not self._owns_async_client:
+            return
+        # 先换上新客户端再等待关闭，同一循环内并发进入的请求不会拿到旧客户端
+        previous, self._async_client = self._async_client, self._build_async_client()
+        if previous is not None:
+            try:
+                await previous.close()
+            except Exception as exc:
+                # 旧循环已关闭时其连接无法优雅断开，连接池仍会被标记为关闭
+                LOGGER.debug("关闭旧的异步 LLM 客户端失败: %r", exc)
+
+    def _has_client(self) -> bool:
+        return self._client is not None or self._client_pending
+
+    def _sync_client(self) -> Any:
+        if self._client is None and self._client_pending:
+            openai = optional_module("openai")
+            self._client = openai.OpenAI(
+                api_key=self.config.llm_api_key(), base_url=self.config.llm_base_url
+            )
+            self._client_pending = False
+        return self._client
+
+    def _build_async_client(self) -> Any | None:
+        api_key = self.config.llm_api_key()
+        openai = optional_module("openai")
+        if openai is None or not api_key:
+            return None
+        http_client = None
+        httpx = optional_module("httpx")
+        if httpx is not None:
+            limit = self.config.llm_max_concurrency
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=limit, max_keepalive_connections=limit
+                ),
+                timeout=self.config.llm_timeout,
+            )
+        # 重试由 _with_retries 统一控制，关闭 SDK 自带的重试避免叠加
+        return openai.AsyncOpenAI(
+            api_key=api_key,
+            base_url=self.config.llm_base_url,
+            timeout=self.config.llm_timeout,
+            max_retries=0,
+            http_client=http_client,
+        )
+
+    async def _with_retries(self, request: Callable[[], Awaitable[Any]]) -> Any:
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    return await asyncio.wait_for(
+                        request(), timeout=self.config.llm_timeout
+                    )
+            except _retryable_errors():
+                if attempt >= self.config.llm_max_retries:
+                    raise
+            # 退避期间不占用并发名额；随机抖动避免批量请求同时重试
+            delay = self.config.llm_retry_backoff * 2**attempt
+            await asyncio.sleep(delay * (0.5 + random.random()))
+            attempt += 1
+
+    def _cache_model(self) -> str:
+        return f"{self.config.models.llm_provider}:{self.config.models.llm_model}"
 
     @staticmethod
     def _fallback_reason(
@@ -0,0 +1,108 @@
+"""带命中统计的线程安全 LRU 缓存。"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(slots=True)
+class CacheStats:
+    """缓存命中情况的快照。"""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    expired: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache(Generic[K, V]):
+    """容量受限的最近最少使用缓存；``maxsize`` 为 0 时不缓存任何内容。
+
+    ``ttl_seconds`` 大于 0 时条目写入后超过该时长即视为未命中并被移除。
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: float = 0.0) -> None:
+        if maxsize < 0:
+            raise ValueError("maxsize 不能为负数")
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        # 值与过期时刻（time.monotonic），未设置 TTL 时为 inf
+        self._entries: OrderedDict[K, tuple[V, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            value, expires_at = entry
+            if self.ttl_seconds > 0 and expires_at <= time.monotonic():
+                del self._entries[key]
+                self._expired += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        if self.maxsize == 0:
+            return
+        expires_at = (
+            time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else math.inf
+        )
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self, reset_stats: bool = True) -> None:
+        """清空条目；``reset_stats`` 为 False 时保留累计的命中统计。"""
+
+        with self._lock:
+            self._entries.clear()
+            if reset_stats:
+                self._hits = 0
+                self._misses = 0
+                self._expired = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._entries.get(key)  # type: ignore[call-overload]
+        return entry is not None and (
+            self.ttl_seconds <= 0 or entry[1] > time.monotonic()
+        )
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                self._hits,
+                self._misses,
+                self.maxsize,
+                len(self._entries),
+                self._expired,
+            )
+
+
+__all__ = ["CacheStats", "LRUCache"]
@@ -0,0 +1,179 @@
+"""把并发到达的小请求合并成批次执行的微批调度器。"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Generic, Sequence, TypeVar
+
+LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass(slots=True)
+class BatchStats:
+    """批次规模的快照；``histogram`` 以 2 的幂为桶上界（1、2、4、8…）计数。"""
+
+    batches: int
+    items: int
+    max_batch_size: int
+    max_wait_ms: float
+    histogram: dict[int, int]
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.mean_batch_size, 3),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "histogram": {
+                str(bucket): count for bucket, count in self.histogram.items()
+            },
+        }
+
+
+@dataclass(slots=True)
+class _Pending(Generic[T, R]):
+    items: list[T]
+    done: threading.Event = field(default_factory=threading.Event)
+    results: list[R] | None = None
+    error: Exception | None = None
+
+
+class MicroBatcher(Generic[T, R]):
+    """在 ``max_wait_ms`` 窗口内收集并发调用方的请求，合并后一次调用 ``func``。
+
+    ``func`` 接收合并后的列表并按相同顺序返回等长结果，调度器再把结果切分回各
+    调用方。批次在达到 ``max_batch_size`` 条或窗口到期时立即执行；单个调用方
+    提交的条目不会被拆到两个批次中。执行在单独的后台线程中进行，首次
+    :meth:`submit` 时启动。
+    """
+
+    def __init__(
+        self,
+        func: Callable[[list[T]], Sequence[R]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+        name: str = "micro-batch",
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size 至少为 1")
+        self.func = func
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.name = name
+        self._queue: queue.SimpleQueue[_Pending[T, R] | None] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+        self._batches = 0
+        self._items = 0
+        self._histogram: dict[int, int] = {}
+
+    def submit(self, items: Sequence[T]) -> list[R]:
+        """提交一组条目并阻塞等待其结果；``func`` 抛出的异常会原样重新抛出。"""
+
+        if not items:
+            return []
+        pending: _Pending[T, R] = _Pending(list(items))
+        self._ensure_worker()
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.results or []
+
+    def stats(self) -> BatchStats:
+        with self._lock:
+            return BatchStats(
+                self._batches,
+                self._items,
+                self.max_batch_size,
+                self.max_wait_ms,
+                dict(sorted(self._histogram.items())),
+            )
+
+    def close(self) -> None:
+        """通知后台线程退出；之后再次提交会重新启动线程。"""
+
+        with self._lock:
+            worker, self._worker = self._worker, None
+        if worker is not None:
+            self._queue.put(None)
+            worker.join()
+
+    # ------------------------------------------------------------------ 内部方法
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name=self.name, daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            size = len(first.items)
+            deadline = time.perf_counter() + self.max_wait_ms / 1e3
+            stop = False
+            while size < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    pending = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if pending is None:
+                    stop = True
+                    break
+                batch.append(pending)
+                size += len(pending.items)
+            self._execute(batch)
+            if stop:
+                return
+
+    def _execute(self, batch: list[_Pending[T, R]]) -> None:
+        items = [item for pending in batch for item in pending.items]
+        try:
+            results = list(self.func(items))
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"批处理函数返回 {len(results)} 条结果，期望 {len(items)} 条"
+                )
+        except Exception as exc:
+            LOGGER.debug("微批执行失败（%d 条）: %s", len(items), exc)
+            for pending in batch:
+                pending.error = exc
+                pending.done.set()
+            return
+
+        self._record(len(items))
+        offset = 0
+        for pending in batch:
+            pending.results = results[offset : offset + len(pending.items)]
+            offset += len(pending.items)
+            pending.done.set()
+
+    def _record(self, size: int) -> None:
+        bucket = 1 << (size - 1).bit_length()
+        with self._lock:
+            self._batches += 1
+            self._items += size
+            self._histogram[bucket] = self._histogram.get(bucket, 0) + 1
+
+
+__all__ = ["BatchStats", "MicroBatcher"]
@@ -2,91 +2,360 @@
 
 from __future__ import annotations
 
-from typing import Optional
-
-import networkx as nx
+import asyncio
+from typing import TYPE_CHECKING, Hashable, Iterator, Optional, Sequence
 
 from .config import ProjectConfig
+from .csr_graph import CSRGraph, GraphLike
 from .data_ingest import HowToCookIngestor
-from .data_models import RecommendationResult, RecipeRecord, UserProfile
-from .embeddings import RecipeEmbeddingIndex
-from .graph_builder import RecipeGraphBuilder
+from .data_models import (
+    RecommendationResult,
+    RecipeRecord,
+    RetrievalResult,
+    UserProfile,
+)
 from .llm_generator import LLMGenerator
+from .lru import CacheStats, LRUCache
+from .recipe_store import RecipeLike, RecipeStore
 from .retrieval import RecipeRetriever
+from .title_index import TitleMatch
+from .tracing import Tracer
 from .user_profiles import UserProfileRepository
 
+if TYPE_CHECKING:
+    import networkx as nx
+
+# 结果缓存键：(规范化查询, 图版本, 影响结果的配置项)
+ResultKey = tuple[str, int, tuple[Hashable, ...]]
+
+
+def normalize_query(query: str) -> str:
+    """去掉首尾空白并把连续空白合并为一个空格。"""
+
+    return " ".join(query.split())
+
 
 class GraphRAGPipeline:
     """串联数据 → 图构建 → 检索 → 生成。"""
 
+    GRAPH_BACKENDS = ("csr", "networkx")
+
     def __init__(self, config: ProjectConfig | None = None) -> None:
+        # 这三个组件依赖 numpy/networkx，推迟到构造时导入，导入本模块保持轻量
+        from .embeddings import RecipeEmbeddingIndex
+        from .graph_builder import RecipeGraphBuilder
+        from .graph_cache import GraphSnapshotCache
+
         self.config = config or ProjectConfig()
+        if self.config.graph_backend not in self.GRAPH_BACKENDS:
+            raise ValueError(f"未知的图后端: {self.config.graph_backend}")
         self.ingestor = HowToCookIngestor(self.config)
-        self.graph_builder = RecipeGraphBuilder(self.config.similarity_threshold)
+        self.graph_builder = RecipeGraphBuilder(
+            self.config.similarity_threshold,
+            engine=self.config.graph_engine,
+            workers=self.config.graph_build_workers,
+            weights=self.config.similarity_weights,
+        )
+        self.graph_cache = GraphSnapshotCache(self.config.paths.processed_data_dir)
         self.retriever = RecipeRetriever(self.config.max_neighbors)
         self.llm_generator = LLMGenerator(self.config)
         self.user_repository = UserProfileRepository()
-        self.embedding_index = RecipeEmbeddingIndex(self.config.models.embedding_model)
-        self._graph: Optional[nx.Graph] = None
-        self._records: list[RecipeRecord] = []
+        self.embedding_index = RecipeEmbeddingIndex(
+            self.config.models.embedding_model,
+            cache_dir=(
+                self.config.paths.processed_data_dir / "embeddings"
+                if self.config.embedding_cache_enabled
+                else None
+            ),
+            backend=self.config.embedding_backend,
+            ann_lists=self.config.ann_lists,
+            ann_probe=self.config.ann_probe,
+            quantization=self.config.embedding_quantization,
+            rescore_factor=self.config.embedding_rescore_factor,
+            query_cache_size=self.config.query_cache_size,
+            batch_window_ms=self.config.embedding_batch_window_ms,
+            max_batch_size=self.config.embedding_max_batch_size,
+        )
+        # 分阶段计时：关闭时 span() 返回空上下文，几乎没有额外开销
+        self.tracer = Tracer(
+            enabled=self.config.tracing_enabled or self.config.slow_request_ms > 0,
+            slow_threshold_ms=self.config.slow_request_ms,
+        )
+        # 推荐结果缓存；键中带图版本，bootstrap_graph 重建后旧结果自动失效
+        self.result_cache: LRUCache[ResultKey, RecommendationResult] = LRUCache(
+            self.config.result_cache_size, ttl_seconds=self.config.result_cache_ttl
+        )
+        self._graph_version = 0
+        self._graph: Optional[GraphLike] = None
+        self.store = RecipeStore()
 
     @property
-    def graph(self) -> nx.Graph:
+    def graph(self) -> GraphLike:
         if self._graph is None:
             raise RuntimeError("图尚未构建，请先调用 bootstrap_graph().")
         return self._graph
 
-    def bootstrap_graph(self) -> nx.Graph:
-        records = list(self.ingestor.iter_records())
-        self._records = records
-        self._graph = self.graph_builder.build_graph(records)
-        self.embedding_index.build(records)
+    def bootstrap_graph(self) -> GraphLike:
+        tracer = self.tracer
+        with tracer.span("bootstrap"):
+            # 菜谱只在 RecipeStore 中保存一份，图节点、检索器与向量索引都引用其行号
+            with tracer.span("bootstrap.records"):
+                self.store = RecipeStore(self.ingestor.iter_records())
+            self.retriever.store = self.store
+            with tracer.span("bootstrap.graph"):
+                graph = self._load_or_build_graph(list(self.store))
+            if self.config.graph_backend == "csr":
+                # 构建与快照仍基于 networkx，检索阶段换成邻居预排序的 CSR 表示
+                with tracer.span("bootstrap.csr"):
+                    self._graph = CSRGraph.from_networkx(graph)
+            else:
+                self._graph = graph
+            with tracer.span("bootstrap.title_index"):
+                self.retriever.build_title_index(self._graph)
+            with tracer.span("bootstrap.embeddings"):
+                self.embedding_index.build(self.store)
+        self._graph_version += 1
+        self.result_cache.clear(reset_stats=False)
         return self._graph
 
+    def _load_or_build_graph(self, records: list[RecipeLike]) -> nx.Graph:
+        """数据集指纹未变化时直接加载图快照，否则重新构建并写回快照。"""
+
+        if not self.config.graph_cache_enabled:
+            return self.graph_builder.build_graph(records)
+
+        fingerprint = self.graph_cache.fingerprint(
+            self.ingestor.dataset_sources(),
+            self.graph_builder.similarity_threshold,
+            self.graph_builder.weights,
+        )
+        graph = self.graph_cache.load(fingerprint, records)
+        if graph is None:
+            graph = self.graph_builder.build_graph(records)
+            self.graph_cache.save(fingerprint, graph, records)
+        return graph
+
     def recommend(self, user_query: str) -> RecommendationResult:
+        return self.recommend_batch([user_query])[0]
+
+    def recommend_batch(
+        self, user_queries: Sequence[str]
+    ) -> list[RecommendationResult]:
+        """批量推荐：检索阶段共享向量编码与图查询，再逐条生成推荐理由。
+
+        查询先经 :func:`normalize_query` 规范化；命中结果缓存的查询直接返回缓存
+        结果，批内重复的查询只计算一次。
+        """
+
+        with self.tracer.span("recommend"):
+            results, misses = self._cached_results(user_queries)
+            if misses:
+                retrievals = self.retrieve_batch([key[0] for key in misses])
+                generated = [self.generate(retrieval) for retrieval in retrievals]
+                self._store_results(results, misses, generated)
+            return results  # type: ignore[return-value]
+
+    def retrieve_batch(self, user_queries: Sequence[str]) -> list[RetrievalResult]:
+        """检索阶段：定位参考菜谱并召回候选菜谱，不调用 LLM。
+
+        图 ID 与菜名都未命中的查询合并为一次 :meth:`RecipeEmbeddingIndex.query_batch`；
+        图中没有邻居的参考菜谱同样合并为一次批量语义检索。
+        """
+
+        with self.tracer.span("retrieve"):
+            return self._retrieve_batch(user_queries)
+
+    def _retrieve_batch(self, user_queries: Sequence[str]) -> list[RetrievalResult]:
         if self._graph is None:
             self.bootstrap_graph()
 
-        user_profile = self.user_repository.get(user_query)
-        if user_profile:
-            return self._recommend_for_user(user_profile)
+        tracer = self.tracer
+        retrievals: list[RetrievalResult | None] = [None] * len(user_queries)
+        references: dict[int, RecipeLike] = {}
+        unresolved: list[int] = []
+        for idx, query in enumerate(user_queries):
+            with tracer.span("retrieve.user_profile"):
+                user_profile = self.user_repository.get(query)
+            if user_profile:
+                with tracer.span("retrieve.for_user"):
+                    retrievals[idx] = self._retrieve_for_user(user_profile)
+                continue
+            with tracer.span("retrieve.match_reference"):
+                reference = self._match_reference(query)
+            if reference is None:
+                unresolved.append(idx)
+            else:
+                references[idx] = reference
 
-        reference = self._find_reference_recipe(user_query)
-        if reference is None:
-            reference = RecipeRecord(
-                recipe_id="UNKNOWN", title=user_query, ingredients=(), instructions=""
-            )
-            candidates = self.embedding_index.query(
-                user_query,
-                top_k=self.config.max_neighbors,
+        if unresolved:
+            with tracer.span("retrieve.embedding_query"):
+                matches = self.embedding_index.query_batch(
+                    [user_queries[idx] for idx in unresolved],
+                    top_k=self.config.max_neighbors,
+                )
+            for idx, found in zip(unresolved, matches):
+                if found:
+                    references[idx] = found[0]
+                    continue
+                # 向量检索没有任何正分结果时，候选只能来自兜底示例
+                reference = RecipeRecord(
+                    recipe_id="UNKNOWN",
+                    title=user_queries[idx],
+                    ingredients=(),
+                    instructions="",
+                )
+                retrievals[idx] = RetrievalResult(
+                    reference, self._fallback_candidates(reference), user_queries[idx]
+                )
+
+        indices = sorted(references)
+        with tracer.span("retrieve.neighbors"):
+            neighbor_lists = self.retriever.find_similar_recipes_batch(
+                self.graph, [references[idx].recipe_id for idx in indices]
             )
-        else:
-            candidates = self.retriever.find_similar_recipes(
-                self.graph, reference.recipe_id
+        candidates = dict(zip(indices, neighbor_lists))
+        isolated = [idx for idx in indices if not candidates[idx]]
+        if isolated:
+            with tracer.span("retrieve.embedding_similar"):
+                similar = self.embedding_index.find_similar_to_recipes(
+                    [references[idx] for idx in isolated], self.config.max_neighbors
+                )
+            candidates.update(zip(isolated, similar))
+        for idx in indices:
+            reference = references[idx]
+            retrievals[idx] = RetrievalResult(
+                reference,
+                candidates[idx] or self._fallback_candidates(reference),
+                user_queries[idx],
             )
-            if not candidates:
-                candidates = self.embedding_index.find_similar_to_recipe(
-                    reference, self.config.max_neighbors
+        return retrievals
+
+    async def arecommend_batch(
+        self, user_queries: Sequence[str]
+    ) -> list[RecommendationResult]:
+        """检索阶段同 :meth:`recommend_batch`，随后并发发出全部 LLM 请求。"""
+
+        with self.tracer.span("recommend"):
+            results, misses = self._cached_results(user_queries)
+            if misses:
+                retrievals = self.retrieve_batch([key[0] for key in misses])
+                generated = await asyncio.gather(
+                    *(self.agenerate(retrieval) for retrieval in retrievals)
                 )
-        if not candidates:
-            candidates = self._fallback_candidates(reference)
-        explanation = self.llm_generator.generate(reference, candidates, user_query)
+                self._store_results(results, misses, generated)
+            return results  # type: ignore[return-value]
+
+    async def agenerate(self, retrieval: RetrievalResult) -> RecommendationResult:
+        with self.tracer.span("generate.llm"):
+            explanation = await self.llm_generator.agenerate(
+                retrieval.reference_recipe,
+                retrieval.similar_recipes,
+                retrieval.user_input,
+            )
+        return RecommendationResult(
+            reference_recipe=retrieval.reference_recipe,
+            similar_recipes=retrieval.similar_recipes,
+            explanation=explanation,
+        )
+
+    def retrieve(self, user_query: str) -> RetrievalResult:
+        return self.retrieve_batch([user_query])[0]
+
+    def generate_stream(self, retrieval: RetrievalResult) -> Iterator[str]:
+        """逐段产出推荐理由，供 CLI 在检索结果之后实时输出。"""
+
+        return self.llm_generator.generate_stream(
+            retrieval.reference_recipe,
+            retrieval.similar_recipes,
+            retrieval.user_input,
+        )
+
+    def generate(self, retrieval: RetrievalResult) -> RecommendationResult:
+        """生成阶段：基于检索结果调用 LLM 输出推荐理由。"""
+
+        with self.tracer.span("generate.llm"):
+            explanation = self.llm_generator.generate(
+                retrieval.reference_recipe,
+                retrieval.similar_recipes,
+                retrieval.user_input,
+            )
         return RecommendationResult(
-            reference_recipe=reference,
-            similar_recipes=candidates,
+            reference_recipe=retrieval.reference_recipe,
+            similar_recipes=retrieval.similar_recipes,
             explanation=explanation,
         )
 
+    def autocomplete(self, prefix: str, limit: int = 10) -> list[TitleMatch]:
+        """菜名输入联想，供前端在用户输入时实时调用。"""
+
+        if self._graph is None:
+            self.bootstrap_graph()
+        return self.retriever.search_titles(self.graph, prefix, limit)
+
+    def result_cache_stats(self) -> CacheStats:
+        """推荐结果缓存的命中、过期与容量统计。"""
+
+        return self.result_cache.stats()
+
     def run_demo(self, user_query: str = "番茄炒蛋") -> RecommendationResult:
         result = self.recommend(user_query)
         print(result.summary())
         return result
 
-    def _recommend_for_user(self, user_profile: UserProfile) -> RecommendationResult:
-        """根据用户历史菜谱节点构建推荐结果。"""
+    def _cached_results(
+        self, user_queries: Sequence[str]
+    ) -> tuple[list[RecommendationResult | None], dict[ResultKey, list[int]]]:
+        """查找结果缓存，返回已命中的结果列表与未命中的缓存键 → 位置列表。"""
+
+        if self._graph is None:
+            self.bootstrap_graph()
+        # 版本与配置在查找前取定，计算期间图被重建时结果只会写入旧版本的键
+        version = self._graph_version
+        knobs = self._result_cache_knobs()
+        results: list[RecommendationResult | None] = [None] * len(user_queries)
+        misses: dict[ResultKey, list[int]] = {}
+        for idx, query in enumerate(user_queries):
+            key = (normalize_query(query), version, knobs)
+            cached = self.result_cache.get(key)
+            if cached is None:
+                misses.setdefault(key, []).append(idx)
+            else:
+                results[idx] = cached
+        return results, misses
+
+    def _store_results(
+        self,
+        results: list[RecommendationResult | None],
+        misses: dict[ResultKey, list[int]],
+        generated: Sequence[RecommendationResult],
+    ) -> None:
+        for (key, positions), result in zip(misses.items(), generated):
+            # LLM 请求失败后的模板理由不缓存，下次请求仍会重试
+            if not self.llm_generator.is_degraded(
+                result.reference_recipe, result.similar_recipes, result.explanation
+            ):
+                self.result_cache.put(key, result)
+            for idx in positions:
+                results[idx] = result
+
+    def _result_cache_knobs(self) -> tuple[Hashable, ...]:
+        """影响推荐结果、且不随重建图而变化的配置项。"""
+
+        config = self.config
+        return (
+            config.max_neighbors,
+            config.ann_probe,
+            config.models.llm_provider,
+            config.models.llm_model,
+            config.llm_prompt_token_budget,
+            config.llm_prompt_instruction_chars,
+        )
+
+    def _retrieve_for_user(self, user_profile: UserProfile) -> RetrievalResult:
+        """根据用户历史菜谱节点检索候选菜谱。"""
 
-        all_candidates: list[RecipeRecord] = []
-        reference: RecipeRecord | None = None
+        all_candidates: list[RecipeLike] = []
+        reference: RecipeLike | None = None
         for recipe_id in user_profile.liked_recipe_ids:
             record = self.retriever.get_recipe_record(self.graph, recipe_id)
             if not record:
@@ -119,18 +388,13 @@ class GraphRAGPipeline:
                 )
             if not candidates:
                 candidates = self._fallback_candidates(reference)
-            explanation = self.llm_generator.generate(
+            return RetrievalResult(
                 reference,
                 candidates,
                 f"用户 {user_profile.user_id} 偏好 {fallback_query}",
             )
-            return RecommendationResult(
-                reference_recipe=reference,
-                similar_recipes=candidates,
-                explanation=explanation,
-            )
 
-        deduped: list[RecipeRecord] = []
+        deduped: list[RecipeLike] = []
         seen_ids = set(user_profile.liked_recipe_ids)
         seen_ids.add(reference.recipe_id)
         candidate_seen: set[str] = set()
@@ -153,17 +417,20 @@ class GraphRAGPipeline:
             f"用户 {user_profile.user_id} 偏好 {', '.join(user_profile.preferred_tags) or '家常菜'}，"
             f"曾做过 {reference.title}"
         )
-        explanation = self.llm_generator.generate(reference, deduped, explanation_input)
-        return RecommendationResult(
-            reference_recipe=reference, similar_recipes=deduped, explanation=explanation
-        )
+        return RetrievalResult(reference, deduped, explanation_input)
 
     def _fallback_candidates(
-        self, reference: RecipeRecord, limit: int | None = None
-    ) -> list[RecipeRecord]:
+        self, reference: RecipeLike, limit: int | None = None
+    ) -> list[RecipeLike]:
         """当图中缺乏相似节点时，使用示例菜谱作为兜底。"""
 
-        candidate_pool = list(self._records)
+        with self.tracer.span("retrieve.fallback"):
+            return self._rank_fallback_candidates(reference, limit)
+
+    def _rank_fallback_candidates(
+        self, reference: RecipeLike, limit: int | None
+    ) -> list[RecipeLike]:
+        candidate_pool: list[RecipeLike] = list(self.store)
         existing_ids = {record.recipe_id for record in candidate_pool}
         for sample in self.ingestor.load_sample_records():
             if sample.recipe_id not in existing_ids:
@@ -173,7 +440,7 @@ class GraphRAGPipeline:
         if not candidate_pool:
             candidate_pool = self.ingestor.load_sample_records()
 
-        scores: list[tuple[float, RecipeRecord]] = []
+        scores: list[tuple[float, RecipeLike]] = []
         for record in candidate_pool:
             if record.recipe_id == reference.recipe_id:
                 continue
@@ -191,7 +458,7 @@ class GraphRAGPipeline:
         return fallback_pool[: limit or self.config.max_neighbors]
 
     @staticmethod
-    def _overlap_score(left: RecipeRecord, right: RecipeRecord) -> float:
+    def _overlap_score(left: RecipeLike, right: RecipeLike) -> float:
         ingredients_left = set(left.ingredients)
         ingredients_right = set(right.ingredients)
         tags_left = set(left.tags)
@@ -200,20 +467,26 @@ class GraphRAGPipeline:
         tag_overlap = len(tags_left & tags_right)
         return ingredient_overlap * 2 + tag_overlap
 
-    def _find_reference_recipe(self, query: str) -> RecipeRecord | None:
+    def _find_reference_recipe(self, query: str) -> RecipeLike | None:
         """综合文本匹配与向量检索，定位最相关的菜谱。"""
 
-        if query in self.graph:
-            record = self.retriever.get_recipe_record(self.graph, query)
-            if record:
-                return record
-
-        reference = self.retriever.match_recipe_by_text(self.graph, query)
+        with self.tracer.span("retrieve.match_reference"):
+            reference = self._match_reference(query)
         if reference:
             return reference
 
-        embedding_matches = self.embedding_index.query(query, top_k=1)
+        with self.tracer.span("retrieve.embedding_query"):
+            embedding_matches = self.embedding_index.query(query, top_k=1)
         return embedding_matches[0] if embedding_matches else None
 
+    def _match_reference(self, query: str) -> RecipeLike | None:
+        """仅依赖图节点 ID 与菜名索引的精确定位，不触发向量编码。"""
+
+        if query in self.graph:
+            record = self.retriever.get_recipe_record(self.graph, query)
+            if record:
+                return record
+        return self.retriever.match_recipe_by_text(self.graph, query)
+
 
 __all__ = ["GraphRAGPipeline"]
@@ -0,0 +1,220 @@
+"""带 token 预算的推荐理由 prompt 构建。"""
+
+from __future__ import annotations
+
+import logging
+import math
+import re
+from dataclasses import dataclass
+from typing import Callable, Sequence
+
+from .data_models import RecipeRecord
+from .lazy_imports import optional_module
+
+LOGGER = logging.getLogger(__name__)
+
+TokenCounter = Callable[[str], int]
+
+# 中日韩文字、全角标点在常见分词器中通常各占约 1 个 token
+_WIDE_CHARS = re.compile(r"[\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]")
+# 食材行形如「番茄 2 个」「盐：5g」「鸡蛋(大)」，名称截止到第一个空白、数字、冒号或括号
+_INGREDIENT_NAME = re.compile(r"^[^\s\d:：(（,，]+")
+
+# 压缩级别，依次放弃更多细节
+DETAIL_LEVELS = ("full", "no_candidate_instructions", "no_instructions", "names_only")
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估计 token 数：宽字符各计 1 个，其余字符约 4 个计 1 个。"""
+
+    wide = len(_WIDE_CHARS.findall(text))
+    return wide + math.ceil((len(text) - wide) / 4)
+
+
+def make_token_counter(model: str) -> TokenCounter:
+    """已安装 tiktoken 且识别该模型时精确计数，否则退回 :func:`estimate_tokens`。
+
+    tiktoken 与分词表在第一次计数时才加载，不影响启动时间。
+    """
+
+    resolved: list[TokenCounter] = []
+
+    def count(text: str) -> int:
+        if not resolved:
+            resolved.append(_resolve_counter(model))
+        return resolved[0](text)
+
+    return count
+
+
+def _resolve_counter(model: str) -> TokenCounter:
+    tiktoken = optional_module("tiktoken")
+    if tiktoken is None:
+        return estimate_tokens
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except (KeyError, ValueError, OSError) as exc:  # 未知模型或分词表下载失败
+        LOGGER.debug("tiktoken 无法用于模型 %s，改用估算: %s", model, exc)
+        return estimate_tokens
+    return lambda text: len(encoding.encode_ordinary(text))
+
+
+def ingredient_name(line: str) -> str:
+    """从原始食材行中取出食材名称，去掉用量与备注。"""
+
+    line = line.strip()
+    match = _INGREDIENT_NAME.match(line)
+    return match.group(0) if match else line
+
+
+@dataclass(slots=True)
+class PromptStats:
+    """一次 prompt 构建的规模与压缩情况。"""
+
+    tokens: int
+    budget: int
+    detail: str
+    candidates: int
+    dropped_candidates: int
+    shared_ingredients: int
+
+    @property
+    def within_budget(self) -> bool:
+        return self.budget <= 0 or self.tokens <= self.budget
+
+
+@dataclass(slots=True)
+class BuiltPrompt:
+    text: str
+    stats: PromptStats
+
+
+class PromptBuilder:
+    """在 ``token_budget`` 内组装参考菜谱与候选菜谱。
+
+    候选菜谱中与参考菜谱相同的食材只列出名称，不再重复原始用量行。超出预算时
+    按以下顺序压缩，直到满足预算：去掉候选的做法摘要、去掉参考菜谱的做法摘要、
+    食材只保留名称、从相似度最低的一端减少候选（至少保留 ``min_candidates`` 条）。
+    ``token_budget`` 为 0 表示不限制。
+    """
+
+    HEADER = "你是一名善于解释口味风格的智能厨房助手。"
+    FOOTER = "请用中文生成推荐理由，突出共同食材或口味，并给出建议。"
+
+    def __init__(
+        self,
+        token_budget: int = 0,
+        instruction_chars: int = 200,
+        min_candidates: int = 1,
+        counter: TokenCounter | None = None,
+    ) -> None:
+        self.token_budget = token_budget
+        self.instruction_chars = instruction_chars
+        self.min_candidates = min_candidates
+        self.count_tokens = counter or estimate_tokens
+
+    def build(
+        self,
+        reference: RecipeRecord,
+        candidates: Sequence[RecipeRecord],
+        user_input: str,
+    ) -> BuiltPrompt:
+        candidates = list(candidates)
+        for level in range(len(DETAIL_LEVELS)):
+            text, shared = self._render(reference, candidates, user_input, level)
+            tokens = self.count_tokens(text)
+            if self.token_budget <= 0 or tokens <= self.token_budget:
+                break
+
+        keep = len(candidates)
+        floor = min(self.min_candidates, keep)
+        while self.token_budget > 0 and tokens > self.token_budget and keep > floor:
+            keep -= 1
+            text, shared = self._render(reference, candidates[:keep], user_input, level)
+            tokens = self.count_tokens(text)
+
+        stats = PromptStats(
+            tokens=tokens,
+            budget=self.token_budget,
+            detail=DETAIL_LEVELS[level],
+            candidates=keep,
+            dropped_candidates=len(candidates) - keep,
+            shared_ingredients=shared,
+        )
+        return BuiltPrompt(text, stats)
+
+    # ------------------------------------------------------------------ 内部方法
+    def _render(
+        self,
+        reference: RecipeRecord,
+        candidates: Sequence[RecipeRecord],
+        user_input: str,
+        level: int,
+    ) -> tuple[str, int]:
+        names_only = level >= 3
+        reference_names = {ingredient_name(line) for line in reference.ingredients}
+        parts = [
+            self.HEADER,
+            f"用户输入: {user_input}",
+            "参考菜谱:",
+            self._chunk(
+                reference,
+                {"主要食材": self._ingredients(reference.ingredients, names_only)},
+                with_instructions=level < 2,
+            ),
+            "候选菜谱:",
+        ]
+
+        shared_total = 0
+        for recipe in candidates:
+            shared: list[str] = []
+            others: list[str] = []
+            for line in recipe.ingredients:
+                name = ingredient_name(line)
+                if name in reference_names:
+                    shared.append(name)
+                else:
+                    others.append(line)
+            shared_total += len(shared)
+            fields = {"共同食材": "、".join(dict.fromkeys(shared))}
+            fields["其他食材" if shared else "主要食材"] = self._ingredients(
+                others, names_only
+            )
+            parts.append(self._chunk(recipe, fields, with_instructions=level < 1))
+        parts.append(self.FOOTER)
+        return "\n\n".join(parts), shared_total
+
+    def _chunk(
+        self,
+        recipe: RecipeRecord,
+        fields: dict[str, str],
+        with_instructions: bool,
+    ) -> str:
+        lines = [f"菜名: {recipe.title}"]
+        lines.extend(f"{label}: {value}" for label, value in fields.items() if value)
+        if len(lines) == 1:
+            lines.append("主要食材: 未知")
+        lines.append(f"口味/标签: {', '.join(recipe.tags) or '未标注'}")
+        if with_instructions and recipe.instructions:
+            snippet = recipe.instructions[: self.instruction_chars]
+            if len(snippet) < len(recipe.instructions):
+                snippet += "..."
+            lines.append(f"做法摘要: {snippet}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _ingredients(lines: Sequence[str], names_only: bool) -> str:
+        if names_only:
+            return "、".join(dict.fromkeys(ingredient_name(line) for line in lines))
+        return ", ".join(lines)
+
+
+__all__ = [
+    "DETAIL_LEVELS",
+    "BuiltPrompt",
+    "PromptBuilder",
+    "PromptStats",
+    "estimate_tokens",
+    "ingredient_name",
+    "make_token_counter",
+]
@@ -0,0 +1,98 @@
+"""量化的菜谱向量：int8 粗排 + float32 精排。"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+
+class QuantizedMatrix:
+    """以逐维缩放 int8 保存的向量矩阵。
+
+    第一轮在量化域内对全部向量打分，只把得分最高的 ``top_k × rescore_factor``
+    条候选交给全精度向量重新计算内积。全精度矩阵通常是磁盘缓存的内存映射，
+    精排只会读入候选所在的页，常驻内存主要是量化后的矩阵，为 float32 的 1/4。
+
+    不提供 float16：NumPy 的 float16→float32 转换没有硬件加速，粗排比直接
+    用 float32 打分慢数倍（20 万×384 单条查询约 170ms 对 30ms），换来的
+    只是一半内存。
+    """
+
+    MODES = ("int8",)
+    # 反量化时每批处理的行数：块足够小才能留在 CPU 缓存里，转换后立即参与乘法
+    ROW_BLOCK = 1024
+
+    def __init__(self, codes: np.ndarray, scales: np.ndarray, mode: str) -> None:
+        if mode not in self.MODES:
+            raise ValueError(f"未知的量化方式: {mode}")
+        self.codes = codes
+        self.scales = scales
+        self.mode = mode
+
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray, mode: str) -> QuantizedMatrix:
+        if mode not in cls.MODES:
+            raise ValueError(f"未知的量化方式: {mode}")
+        rows, dim = matrix.shape
+        # 每一维按该维绝对值最大值缩放到 [-127, 127]
+        peak = np.zeros(dim, dtype=np.float32)
+        for start in range(0, rows, cls.ROW_BLOCK):
+            block = np.abs(np.asarray(matrix[start : start + cls.ROW_BLOCK]))
+            np.maximum(peak, block.max(axis=0), out=peak)
+        scales = np.where(peak > 0, peak / 127.0, 1.0).astype(np.float32)
+        codes = np.empty((rows, dim), dtype=np.int8)
+        for start in range(0, rows, cls.ROW_BLOCK):
+            block = np.asarray(matrix[start : start + cls.ROW_BLOCK]) / scales
+            codes[start : start + len(block)] = np.clip(np.rint(block), -127, 127)
+        return cls(codes, scales, mode)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def approximate_scores(self, vectors: np.ndarray) -> np.ndarray:
+        """量化域内的内积，返回 (查询数, 向量数) 的 float32 得分矩阵。"""
+
+        # 把缩放系数并入查询向量，矩阵一侧只需把编码转换为 float32
+        weighted = np.ascontiguousarray((vectors * self.scales).T, dtype=np.float32)
+        scores = np.empty((len(vectors), len(self.codes)), dtype=np.float32)
+        buffer = np.empty((self.ROW_BLOCK, self.codes.shape[1]), dtype=np.float32)
+        for start in range(0, len(self.codes), self.ROW_BLOCK):
+            codes = self.codes[start : start + self.ROW_BLOCK]
+            block = buffer[: len(codes)]
+            np.copyto(block, codes, casting="unsafe")
+            scores[:, start : start + len(codes)] = (block @ weighted).T
+        return scores
+
+    def search_batch(
+        self,
+        vectors: np.ndarray,
+        top_k: int,
+        exclude_rows: Sequence[Sequence[int]],
+        full_precision: np.ndarray,
+        rescore_factor: int = 4,
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        """粗排后用 ``full_precision`` 精排，返回 (行号, float32 得分)，按得分降序。"""
+
+        scores = self.approximate_scores(vectors)
+        for offset, rows in enumerate(exclude_rows):
+            scores[offset, list(rows)] = -np.inf
+        width = min(len(self.codes), max(top_k, top_k * rescore_factor))
+        shortlist = np.argpartition(scores, -width, axis=1)[:, -width:]
+
+        hits: list[tuple[np.ndarray, np.ndarray]] = []
+        for vector, rows, approx in zip(vectors, shortlist, scores):
+            rows = np.sort(rows[np.isfinite(approx[rows])])
+            exact = full_precision[rows] @ vector
+            keep = min(top_k, len(rows))
+            top = np.argpartition(exact, -keep)[-keep:] if keep else rows[:0]
+            top = top[np.argsort(exact[top])[::-1]]
+            hits.append((rows[top].astype(np.int64), exact[top]))
+        return hits
+
+
+__all__ = ["QuantizedMatrix"]
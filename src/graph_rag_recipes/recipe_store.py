@@ -0,0 +1,195 @@
+"""列式菜谱存储：图、检索与向量索引共享同一份菜谱数据。"""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from typing import Any, Iterable, Iterator
+
+from .data_models import RecipeRecord
+
+
+class RecipeStore:
+    """以整数行号寻址的菜谱存储。
+
+    标题、做法等字段按列保存；食材与标签字符串驻留到词表中，每行只记录词表 ID，
+    因此“盐”“葱”这类高频食材在整个语料中只保存一份。通过 :meth:`view` 取得的
+    :class:`RecipeView` 仅持有 (store, row) 两个引用，不复制任何字段。
+    """
+
+    __slots__ = (
+        "_ids",
+        "_row_of",
+        "_titles",
+        "_instructions",
+        "_source_paths",
+        "_ingredients",
+        "_tags",
+    )
+
+    def __init__(self, records: Iterable[RecipeRecord] = ()) -> None:
+        self._ids: list[str] = []
+        self._row_of: dict[str, int] = {}
+        self._titles: list[str] = []
+        self._instructions: list[str] = []
+        self._source_paths: list[str | None] = []
+        self._ingredients = _InternedColumn()
+        self._tags = _InternedColumn()
+        for record in records:
+            self.append(record)
+
+    def append(self, record: RecipeRecord) -> int:
+        """追加一条菜谱并返回行号；重复的 ``recipe_id`` 直接返回已有行号。"""
+
+        existing = self._row_of.get(record.recipe_id)
+        if existing is not None:
+            return existing
+        row = len(self._ids)
+        recipe_id = sys.intern(record.recipe_id)
+        self._ids.append(recipe_id)
+        self._row_of[recipe_id] = row
+        self._titles.append(record.title)
+        self._instructions.append(record.instructions)
+        self._source_paths.append(record.source_path)
+        self._ingredients.append(record.ingredients)
+        self._tags.append(record.tags)
+        return row
+
+    # ------------------------------------------------------------------ 查询接口
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, recipe_id: object) -> bool:
+        return recipe_id in self._row_of
+
+    def __iter__(self) -> Iterator[RecipeView]:
+        return (RecipeView(self, row) for row in range(len(self._ids)))
+
+    def row_of(self, recipe_id: str) -> int | None:
+        return self._row_of.get(recipe_id)
+
+    def view(self, row: int) -> RecipeView:
+        if not 0 <= row < len(self._ids):
+            raise IndexError(f"菜谱行号越界: {row}")
+        return RecipeView(self, row)
+
+    def get(self, recipe_id: str) -> RecipeView | None:
+        row = self._row_of.get(recipe_id)
+        return None if row is None else RecipeView(self, row)
+
+    def recipe_id(self, row: int) -> str:
+        return self._ids[row]
+
+    def title(self, row: int) -> str:
+        return self._titles[row]
+
+    def instructions(self, row: int) -> str:
+        return self._instructions[row]
+
+    def source_path(self, row: int) -> str | None:
+        return self._source_paths[row]
+
+    def ingredients(self, row: int) -> tuple[str, ...]:
+        return self._ingredients.values(row)
+
+    def tags(self, row: int) -> tuple[str, ...]:
+        return self._tags.values(row)
+
+    def ingredient_codes(self, row: int) -> array:
+        """食材词表 ID，可直接用于集合运算或矩阵编码。"""
+
+        return self._ingredients.codes(row)
+
+    def tag_codes(self, row: int) -> array:
+        return self._tags.codes(row)
+
+
+class _InternedColumn:
+    """变长字符串列：词表 + 扁平 ID 数组 + 行偏移。"""
+
+    __slots__ = ("vocabulary", "lookup", "flat", "offsets")
+
+    def __init__(self) -> None:
+        self.vocabulary: list[str] = []
+        self.lookup: dict[str, int] = {}
+        self.flat = array("I")
+        self.offsets = array("Q", [0])
+
+    def append(self, values: Iterable[str]) -> None:
+        for value in values:
+            code = self.lookup.get(value)
+            if code is None:
+                code = len(self.vocabulary)
+                interned = sys.intern(value)
+                self.vocabulary.append(interned)
+                self.lookup[interned] = code
+            self.flat.append(code)
+        self.offsets.append(len(self.flat))
+
+    def codes(self, row: int) -> array:
+        return self.flat[self.offsets[row] : self.offsets[row + 1]]
+
+    def values(self, row: int) -> tuple[str, ...]:
+        vocabulary = self.vocabulary
+        return tuple(
+            vocabulary[code]
+            for code in self.flat[self.offsets[row] : self.offsets[row + 1]]
+        )
+
+
+class RecipeView:
+    """指向 :class:`RecipeStore` 某一行的只读视图，接口与 ``RecipeRecord`` 一致。"""
+
+    __slots__ = ("store", "row")
+
+    def __init__(self, store: RecipeStore, row: int) -> None:
+        self.store = store
+        self.row = row
+
+    @property
+    def recipe_id(self) -> str:
+        return self.store.recipe_id(self.row)
+
+    @property
+    def title(self) -> str:
+        return self.store.title(self.row)
+
+    @property
+    def ingredients(self) -> tuple[str, ...]:
+        return self.store.ingredients(self.row)
+
+    @property
+    def instructions(self) -> str:
+        return self.store.instructions(self.row)
+
+    @property
+    def tags(self) -> tuple[str, ...]:
+        return self.store.tags(self.row)
+
+    @property
+    def source_path(self) -> str | None:
+        return self.store.source_path(self.row)
+
+    # 复用 RecipeRecord 的实现，两者的 prompt 与序列化格式保持一致
+    as_prompt_chunk = RecipeRecord.as_prompt_chunk
+    to_dict = RecipeRecord.to_dict
+
+    def to_record(self) -> RecipeRecord:
+        return RecipeRecord.from_mapping(self.to_dict())
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, RecipeView):
+            return self.store is other.store and self.row == other.row
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((id(self.store), self.row))
+
+    def __repr__(self) -> str:
+        return f"RecipeView(row={self.row}, recipe_id={self.recipe_id!r}, title={self.title!r})"
+
+
+# 接受两种菜谱表示的接口统一使用该别名
+RecipeLike = RecipeRecord | RecipeView
+
+__all__ = ["RecipeLike", "RecipeStore", "RecipeView"]
@@ -2,25 +2,42 @@
 
 from __future__ import annotations
 
-from typing import Sequence
-
-import networkx as nx
+from typing import Any, Mapping, Sequence
 
+from .csr_graph import CSRGraph, GraphLike
 from .data_models import RecipeRecord
+from .recipe_store import RecipeLike, RecipeStore
+from .title_index import TitleIndex, TitleMatch
 
 
 class RecipeRetriever:
-    """围绕图遍历与排序的轻量封装。"""
+    """围绕图遍历与排序的轻量封装。
+
+    绑定 :class:`RecipeStore` 后，节点上的 ``row`` 属性直接映射为存储视图，
+    不再为每次查询复制菜谱字段。图既可以是 ``nx.Graph``，也可以是邻居已预排序的
+    :class:`CSRGraph`，后者取 top-k 只需切片。文本匹配基于按图缓存的
+    :class:`TitleIndex`，图对象变化时自动重建。
+    """
 
-    def __init__(self, max_neighbors: int = 5) -> None:
+    def __init__(
+        self, max_neighbors: int = 5, store: RecipeStore | None = None
+    ) -> None:
         self.max_neighbors = max_neighbors
+        self.store = store
+        self._title_index: TitleIndex | None = None
+        self._indexed_graph: GraphLike | None = None
 
     def find_similar_recipes(
-        self, graph: nx.Graph, recipe_id: str
-    ) -> Sequence[RecipeRecord]:
+        self, graph: GraphLike, recipe_id: str
+    ) -> Sequence[RecipeLike]:
         if recipe_id not in graph:
             return []
 
+        if isinstance(graph, CSRGraph):
+            return [
+                self._node_to_record(graph, node)
+                for node in graph.top_neighbors_ids(recipe_id, self.max_neighbors)
+            ]
         neighbors = (
             (neighbor, graph[recipe_id][neighbor]["weight"])
             for neighbor in graph.neighbors(recipe_id)
@@ -30,9 +47,27 @@ class RecipeRetriever:
         ]
         return [self._node_to_record(graph, node) for node, _ in sorted_neighbors]
 
+    def find_similar_recipes_batch(
+        self, graph: GraphLike, recipe_ids: Sequence[str]
+    ) -> list[Sequence[RecipeLike]]:
+        """批量邻域检索，结果与 ``recipe_ids`` 一一对应。
+
+        CSR 图一次性切出全部节点的邻居区间；networkx 图没有可向量化的邻接数组，
+        退化为逐个调用 :meth:`find_similar_recipes`。
+        """
+
+        if isinstance(graph, CSRGraph):
+            return [
+                [self._node_to_record(graph, node) for node in neighbors]
+                for neighbors in graph.top_neighbors_ids_batch(
+                    recipe_ids, self.max_neighbors
+                )
+            ]
+        return [self.find_similar_recipes(graph, recipe_id) for recipe_id in recipe_ids]
+
     def recommend_from_text(
-        self, graph: nx.Graph, query: str
-    ) -> tuple[RecipeRecord | None, Sequence[RecipeRecord]]:
+        self, graph: GraphLike, query: str
+    ) -> tuple[RecipeLike | None, Sequence[RecipeLike]]:
         """Fallback：文本匹配最近的节点后再做邻域检索。"""
 
         reference = self.match_recipe_by_text(graph, query)
@@ -41,20 +76,26 @@ class RecipeRetriever:
         candidates = self.find_similar_recipes(graph, reference.recipe_id)
         return reference, candidates
 
-    def match_recipe_by_text(self, graph: nx.Graph, query: str) -> RecipeRecord | None:
+    def match_recipe_by_text(self, graph: GraphLike, query: str) -> RecipeLike | None:
         anchor_id = self._fuzzy_match(graph, query)
         if not anchor_id:
             return None
         return self._node_to_record(graph, anchor_id)
 
-    def get_recipe_record(self, graph: nx.Graph, node_id: str) -> RecipeRecord | None:
+    def get_recipe_record(self, graph: GraphLike, node_id: str) -> RecipeLike | None:
         if node_id not in graph:
             return None
         return self._node_to_record(graph, node_id)
 
-    @staticmethod
-    def _node_to_record(graph: nx.Graph, node_id: str) -> RecipeRecord:
-        data = graph.nodes[node_id]
+    def _node_to_record(self, graph: GraphLike, node_id: str) -> RecipeLike:
+        data = (
+            graph.node_data(node_id)
+            if isinstance(graph, CSRGraph)
+            else graph.nodes[node_id]
+        )
+        row = data.get("row")
+        if row is not None and self.store is not None:
+            return self.store.view(row)
         return RecipeRecord(
             recipe_id=node_id,
             title=data.get("title", node_id),
@@ -63,13 +104,38 @@ class RecipeRetriever:
             tags=data.get("tags", tuple()),
         )
 
-    @staticmethod
-    def _fuzzy_match(graph: nx.Graph, query: str) -> str | None:
-        query_lower = query.lower()
-        for node_id, payload in graph.nodes(data=True):
-            if query_lower in payload.get("title", "").lower():
-                return node_id
-        return None
+    def build_title_index(self, graph: GraphLike) -> TitleIndex:
+        """为 ``graph`` 建立菜名索引，通常在 bootstrap 阶段调用一次。"""
+
+        nodes = (
+            graph.iter_nodes()
+            if isinstance(graph, CSRGraph)
+            else graph.nodes(data=True)
+        )
+        self._title_index = TitleIndex(
+            (node_id, self._node_title(node_id, payload)) for node_id, payload in nodes
+        )
+        self._indexed_graph = graph
+        return self._title_index
+
+    def search_titles(
+        self, graph: GraphLike, query: str, limit: int | None = 10
+    ) -> list[TitleMatch]:
+        """按 完全一致 > 前缀 > 子串 > 标题长度 排序返回命中的菜名。"""
+
+        if self._title_index is None or self._indexed_graph is not graph:
+            self.build_title_index(graph)
+        return self._title_index.search(query, limit)
+
+    def _node_title(self, node_id: str, payload: Mapping[str, Any]) -> str:
+        row = payload.get("row")
+        if row is not None and self.store is not None:
+            return self.store.title(row)
+        return payload.get("title", "")
+
+    def _fuzzy_match(self, graph: GraphLike, query: str) -> str | None:
+        matches = self.search_titles(graph, query, limit=1)
+        return matches[0].node_id if matches else None
 
 
 __all__ = ["RecipeRetriever"]
@@ -0,0 +1,407 @@
+"""常驻推荐服务：启动时加载一次图与向量索引，之后通过 HTTP JSON 接口提供推荐。
+
+仅依赖标准库。请求由固定大小的线程池处理，线程数即并发上限；健康检查
+(``/healthz``) 只反映进程存活，就绪检查 (``/readyz``) 在图加载完成前返回 503，
+便于负载均衡或编排系统在预热期间不转发流量。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import TYPE_CHECKING, Any
+from urllib import error, parse, request
+
+from .data_models import RecommendationResult
+from .lru import CacheStats
+
+if TYPE_CHECKING:
+    from .config import ProjectConfig
+    from .pipeline import GraphRAGPipeline
+
+LOGGER = logging.getLogger(__name__)
+
+# 单次请求体与批量查询条数的上限，避免单个请求占满线程
+MAX_BODY_BYTES = 64 * 1024
+MAX_BATCH_QUERIES = 64
+
+
+class ServiceError(RuntimeError):
+    """推荐服务返回错误或无法连接。"""
+
+    def __init__(self, message: str, status: int | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class _PooledHTTPServer(HTTPServer):
+    """把每个连接交给固定大小线程池处理的 HTTPServer。"""
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        handler: type[BaseHTTPRequestHandler],
+        workers: int,
+    ) -> None:
+        super().__init__(address, handler)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="recommend"
+        )
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        self._executor.submit(self._process_in_worker, request, client_address)
+
+    def _process_in_worker(self, request: Any, client_address: Any) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
+
+class RecommendationService:
+    """持有预热后的 :class:`GraphRAGPipeline` 并对外提供 HTTP 接口。
+
+    接口：
+
+    - ``GET /healthz``：进程存活即返回 200。
+    - ``GET /readyz``：图加载完成返回 200，加载中或失败返回 503。
+    - ``GET /stats``：查询向量与推荐结果缓存的命中率、微批调度的批次规模
+      直方图，以及开启分阶段计时后各阶段的延迟直方图。
+    - ``POST /recommend``：请求体 ``{"query": "U123"}`` 或 ``{"queries": [...]}``；
+      也支持 ``GET /recommend?q=U123``。响应包含 ``results`` 与服务端耗时
+      ``latency_ms``，耗时同时写入 ``Server-Timing`` 响应头与日志。
+    """
+
+    def __init__(
+        self,
+        pipeline: GraphRAGPipeline,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        workers: int = 4,
+    ) -> None:
+        self.pipeline = pipeline
+        self.workers = max(1, workers)
+        self.ready = threading.Event()
+        self.bootstrap_error: str | None = None
+        self.bootstrap_seconds: float | None = None
+        self.started_at = time.monotonic()
+        self.requests_served = 0
+        self._counter_lock = threading.Lock()
+        self.server = _PooledHTTPServer((host, port), _RequestHandler, self.workers)
+        self.server.service = self  # type: ignore[attr-defined]
+
+    @property
+    def address(self) -> tuple[str, int]:
+        host, port = self.server.server_address[:2]
+        return str(host), int(port)
+
+    def start_bootstrap(self) -> threading.Thread:
+        """在后台线程中加载图与索引，服务在此期间即可响应健康检查。"""
+
+        thread = threading.Thread(
+            target=self._bootstrap, name="recommend-bootstrap", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def serve_forever(self) -> None:
+        self.start_bootstrap()
+        host, port = self.address
+        LOGGER.info(
+            "推荐服务监听 http://%s:%d（%d 个工作线程）", host, port, self.workers
+        )
+        self.server.serve_forever()
+
+    def shutdown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def health(self) -> dict[str, Any]:
+        return {
+            "status": "ok",
+            "uptime_s": round(time.monotonic() - self.started_at, 3),
+            "requests_served": self.requests_served,
+        }
+
+    def readiness(self) -> tuple[HTTPStatus, dict[str, Any]]:
+        if self.bootstrap_error is not None:
+            payload = {"status": "failed", "error": self.bootstrap_error}
+            return HTTPStatus.SERVICE_UNAVAILABLE, payload
+        if not self.ready.is_set():
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"status": "starting"}
+        payload = {
+            "status": "ready",
+            "recipes": len(self.pipeline.store),
+            "bootstrap_s": round(self.bootstrap_seconds or 0.0, 3),
+        }
+        return HTTPStatus.OK, payload
+
+    def stats(self) -> dict[str, Any]:
+        index = self.pipeline.embedding_index
+        batches = index.batch_stats()
+        return {
+            "requests_served": self.requests_served,
+            "query_cache": _cache_stats(index.query_cache_stats()),
+            "result_cache": _cache_stats(self.pipeline.result_cache_stats()),
+            "embedding_batches": batches.to_dict() if batches is not None else None,
+            "stages": {
+                name: histogram.to_dict()
+                for name, histogram in self.pipeline.tracer.histograms().items()
+            },
+        }
+
+    def recommend(self, queries: list[str]) -> list[dict[str, Any]]:
+        results = self.pipeline.recommend_batch(queries)
+        with self._counter_lock:
+            self.requests_served += 1
+        return [result.to_dict() for result in results]
+
+    # ------------------------------------------------------------------ 内部方法
+    def _bootstrap(self) -> None:
+        start = time.perf_counter()
+        try:
+            self.pipeline.bootstrap_graph()
+        except Exception as exc:
+            self.bootstrap_error = f"{type(exc).__name__}: {exc}"
+            LOGGER.exception("推荐服务预热失败")
+            return
+        self.bootstrap_seconds = time.perf_counter() - start
+        self.ready.set()
+        LOGGER.info(
+            "推荐服务就绪：%d 道菜谱，预热 %.2fs",
+            len(self.pipeline.store),
+            self.bootstrap_seconds,
+        )
+
+
+def _cache_stats(stats: CacheStats) -> dict[str, Any]:
+    return {
+        "hits": stats.hits,
+        "misses": stats.misses,
+        "hit_rate": round(stats.hit_rate, 4),
+        "size": stats.currsize,
+        "expired": stats.expired,
+    }
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server_version = "GraphRAGRecipes/1.0"
+    # HTTP/1.0 每个请求后关闭连接，空闲的长连接不会占用工作线程
+    protocol_version = "HTTP/1.0"
+
+    @property
+    def service(self) -> RecommendationService:
+        return self.server.service  # type: ignore[attr-defined]
+
+    def handle_one_request(self) -> None:
+        self._started_at = time.perf_counter()
+        super().handle_one_request()
+
+    def do_GET(self) -> None:
+        url = parse.urlsplit(self.path)
+        if url.path == "/healthz":
+            self._send_json(HTTPStatus.OK, self.service.health())
+        elif url.path == "/readyz":
+            self._send_json(*self.service.readiness())
+        elif url.path == "/stats":
+            self._send_json(HTTPStatus.OK, self.service.stats())
+        elif url.path == "/recommend":
+            queries = parse.parse_qs(url.query).get("q", [])
+            self._handle_recommend(queries)
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, f"未知路径: {url.path}")
+
+    def do_POST(self) -> None:
+        if parse.urlsplit(self.path).path != "/recommend":
+            self._send_error(HTTPStatus.NOT_FOUND, f"未知路径: {self.path}")
+            return
+        raw_length = self.headers.get("Content-Length")
+        if raw_length is None:
+            self._send_error(HTTPStatus.LENGTH_REQUIRED, "缺少 Content-Length")
+            return
+        try:
+            length = int(raw_length)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send_error(
+                HTTPStatus.BAD_REQUEST, f"Content-Length 不合法: {raw_length}"
+            )
+            return
+        if length > MAX_BODY_BYTES:
+            self._send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "请求体过大")
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            self._send_error(HTTPStatus.BAD_REQUEST, f"请求体不是合法 JSON: {exc}")
+            return
+        if not isinstance(payload, dict):
+            self._send_error(HTTPStatus.BAD_REQUEST, "请求体应为 JSON 对象")
+            return
+        queries = payload.get("queries")
+        if queries is None:
+            queries = [payload["query"]] if "query" in payload else []
+        self._handle_recommend(queries)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # 访问日志由 _send_json 统一输出（带耗时），这里只保留调试信息
+        LOGGER.debug("%s - %s", self.address_string(), format % args)
+
+    # ------------------------------------------------------------------ 内部方法
+    def _handle_recommend(self, queries: Any) -> None:
+        if (
+            not isinstance(queries, list)
+            or not queries
+            or not all(isinstance(item, str) and item.strip() for item in queries)
+        ):
+            self._send_error(
+                HTTPStatus.BAD_REQUEST, "需要非空的 query 字符串或 queries 列表"
+            )
+            return
+        if len(queries) > MAX_BATCH_QUERIES:
+            self._send_error(
+                HTTPStatus.BAD_REQUEST, f"单次最多 {MAX_BATCH_QUERIES} 条查询"
+            )
+            return
+        if not self.service.ready.is_set():
+            self._send_error(
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                "服务预热中",
+                headers={"Retry-After": "1"},
+            )
+            return
+        try:
+            results = self.service.recommend(queries)
+        except Exception as exc:
+            LOGGER.exception("推荐请求失败: %s", queries)
+            self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, f"推荐失败: {exc}")
+            return
+        self._send_json(HTTPStatus.OK, {"results": results})
+
+    def _send_error(
+        self,
+        status: HTTPStatus,
+        message: str,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self._send_json(status, {"error": message}, headers)
+
+    def _send_json(
+        self,
+        status: HTTPStatus,
+        payload: dict[str, Any],
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        # 处理线程拿到请求后才开始计时，耗时不含在线程池中排队的时间
+        latency_ms = (time.perf_counter() - self._started_at) * 1e3
+        payload = {**payload, "latency_ms": round(latency_ms, 3)}
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Server-Timing", f"app;dur={latency_ms:.3f}")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        LOGGER.info("%s %s %d %.1fms", self.command, self.path, int(status), latency_ms)
+
+
+class RecommendationClient:
+    """推荐服务的轻量客户端，只依赖标准库，不加载管线与模型。"""
+
+    def __init__(self, base_url: str, timeout: float = 30.0) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.last_latency_ms: float | None = None
+
+    def health(self) -> dict[str, Any]:
+        return self._request("GET", "/healthz")
+
+    def is_ready(self) -> bool:
+        try:
+            self._request("GET", "/readyz")
+        except ServiceError:
+            return False
+        return True
+
+    def wait_until_ready(self, timeout: float = 60.0, interval: float = 0.5) -> None:
+        deadline = time.monotonic() + timeout
+        while not self.is_ready():
+            if time.monotonic() >= deadline:
+                raise ServiceError(f"推荐服务在 {timeout:.0f}s 内未就绪")
+            time.sleep(interval)
+
+    def recommend(self, query: str) -> RecommendationResult:
+        return self.recommend_batch([query])[0]
+
+    def recommend_batch(self, queries: list[str]) -> list[RecommendationResult]:
+        """返回推荐结果；服务端耗时记录在 ``last_latency_ms``。"""
+
+        payload = self._request("POST", "/recommend", {"queries": list(queries)})
+        self.last_latency_ms = payload.get("latency_ms")
+        return [RecommendationResult.from_mapping(item) for item in payload["results"]]
+
+    # ------------------------------------------------------------------ 内部方法
+    def _request(
+        self, method: str, path: str, body: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        data = None if body is None else json.dumps(body).encode("utf-8")
+        req = request.Request(
+            self.base_url + path,
+            data=data,
+            method=method,
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with request.urlopen(req, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except error.HTTPError as exc:
+            try:
+                detail = json.loads(exc.read()).get("error") or exc.reason
+            except (ValueError, AttributeError):
+                detail = exc.reason
+            raise ServiceError(f"推荐服务返回 {exc.code}: {detail}", exc.code) from exc
+        except (TimeoutError, error.URLError, ConnectionError) as exc:
+            raise ServiceError(f"无法连接推荐服务 {self.base_url}: {exc}") from exc
+
+
+def serve(config: ProjectConfig | None = None) -> None:
+    """按配置启动推荐服务并阻塞运行，Ctrl+C 退出。"""
+
+    from .config import ProjectConfig
+    from .pipeline import GraphRAGPipeline
+
+    config = config or ProjectConfig()
+    service = RecommendationService(
+        GraphRAGPipeline(config),
+        host=config.service_host,
+        port=config.service_port,
+        workers=config.service_workers,
+    )
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        LOGGER.info("推荐服务退出")
+    finally:
+        service.server.server_close()
+
+
+__all__ = [
+    "RecommendationClient",
+    "RecommendationService",
+    "ServiceError",
+    "serve",
+]
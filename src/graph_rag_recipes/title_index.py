@@ -0,0 +1,106 @@
+"""菜名倒排索引：基于汉字 n-gram 的子串/前缀检索与自动补全。"""
+
+from __future__ import annotations
+
+import heapq
+from array import array
+from dataclasses import dataclass
+from typing import Iterable
+
+# 匹配类型按优先级排列：完全一致 > 前缀 > 子串
+MATCH_KINDS = ("exact", "prefix", "substring")
+
+
+@dataclass(slots=True)
+class TitleMatch:
+    """一条菜名命中结果。"""
+
+    node_id: str
+    title: str
+    kind: str
+
+
+class TitleIndex:
+    """以单字与相邻双字为词项的倒排索引。
+
+    中文菜名没有空格分词，按字切分的 n-gram 足以覆盖任意子串查询：长度 ≥ 2 的
+    查询只需取其双字中倒排最短的一条作为候选集再逐一校验，代价与该倒排长度成
+    正比，而不是与菜谱总数成正比。排序规则为匹配类型优先，其次标题更短者优先，
+    最后按插入顺序保证结果稳定。
+    """
+
+    __slots__ = ("_node_ids", "_titles", "_normalized", "_postings")
+
+    def __init__(self, entries: Iterable[tuple[str, str]] = ()) -> None:
+        self._node_ids: list[str] = []
+        self._titles: list[str] = []
+        self._normalized: list[str] = []
+        postings: dict[str, list[int]] = {}
+        for node_id, title in entries:
+            idx = len(self._node_ids)
+            normalized = self.normalize(title)
+            self._node_ids.append(node_id)
+            self._titles.append(title)
+            self._normalized.append(normalized)
+            for gram in self._grams(normalized):
+                postings.setdefault(gram, []).append(idx)
+        self._postings = {gram: array("I", rows) for gram, rows in postings.items()}
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return text.lower()
+
+    def __len__(self) -> int:
+        return len(self._node_ids)
+
+    def search(self, query: str, limit: int | None = None) -> list[TitleMatch]:
+        """返回包含 ``query`` 的菜名，按 完全一致 > 前缀 > 子串 > 标题长度 排序。"""
+
+        needle = self.normalize(query)
+        normalized = self._normalized
+        ranked: list[tuple[int, int, int]] = []
+        for idx in self._candidates(needle):
+            title = normalized[idx]
+            if title == needle:
+                rank = 0
+            elif title.startswith(needle):
+                rank = 1
+            elif needle in title:
+                rank = 2
+            else:
+                continue
+            ranked.append((rank, len(title), idx))
+
+        if limit is not None:
+            ranked = heapq.nsmallest(max(limit, 0), ranked)
+        else:
+            ranked.sort()
+        return [
+            TitleMatch(self._node_ids[idx], self._titles[idx], MATCH_KINDS[rank])
+            for rank, _, idx in ranked
+        ]
+
+    # ------------------------------------------------------------------ 内部方法
+    def _candidates(self, needle: str) -> Iterable[int]:
+        if not needle:
+            return range(len(self._node_ids))
+        if len(needle) == 1:
+            return self._postings.get(needle, ())
+        # 每个候选都会再做子串校验，只需取最短的一条双字倒排
+        best: array | None = None
+        for idx in range(len(needle) - 1):
+            posting = self._postings.get(needle[idx : idx + 2])
+            if posting is None:
+                return ()
+            if best is None or len(posting) < len(best):
+                best = posting
+        return best
+
+    @staticmethod
+    def _grams(text: str) -> set[str]:
+        grams = set(text)
+        grams.update(text[idx : idx + 2] for idx in range(len(text) - 1))
+        return grams
+
+
+__all__ = ["MATCH_KINDS", "TitleIndex", "TitleMatch"]
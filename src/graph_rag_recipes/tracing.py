@@ -0,0 +1,252 @@
+"""轻量级分阶段计时：命名 span、进程内延迟直方图与慢请求日志。
+
+用法::
+
+    tracer = Tracer(enabled=True, slow_threshold_ms=200)
+    with tracer.span("recommend"):
+        with tracer.span("retrieve.neighbors"):
+            ...
+    print(tracer.last_trace.format())
+
+最外层 span 构成一次 trace，内部 span 按嵌套关系记录在其中；当前 trace 保存在
+:class:`contextvars.ContextVar` 中，线程之间互不干扰，asyncio 任务继承创建时的
+trace。关闭时 :meth:`Tracer.span` 直接返回共享的空上下文，开销只有一次属性判断。
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextlib
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, ContextManager
+
+LOGGER = logging.getLogger(__name__)
+
+# 直方图桶上界（毫秒），最后一个桶收纳所有更慢的样本
+BUCKET_BOUNDS_MS = (
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    25.0,
+    50.0,
+    100.0,
+    250.0,
+    500.0,
+    1000.0,
+    2500.0,
+    5000.0,
+    10000.0,
+    float("inf"),
+)
+
+_NULL_SPAN = contextlib.nullcontext()
+# (当前 trace 的 span 列表, 当前路径, 嵌套深度)
+_ACTIVE: ContextVar[tuple[list[SpanRecord], str, int] | None] = ContextVar(
+    "graph_rag_recipes_trace", default=None
+)
+
+
+@dataclass(slots=True)
+class SpanRecord:
+    path: str
+    depth: int
+    duration: float = 0.0
+
+
+@dataclass(slots=True)
+class Trace:
+    """一次完整请求的 span 明细，``spans`` 按进入顺序排列。"""
+
+    name: str
+    duration: float
+    spans: list[SpanRecord]
+
+    def breakdown(self) -> list[tuple[str, int, int, float]]:
+        """按路径合并重复 span，返回 (路径, 深度, 次数, 总耗时秒)。"""
+
+        merged: dict[str, list[Any]] = {}
+        for span in self.spans:
+            entry = merged.setdefault(span.path, [span.depth, 0, 0.0])
+            entry[1] += 1
+            entry[2] += span.duration
+        return [
+            (path, depth, count, total)
+            for path, (depth, count, total) in merged.items()
+        ]
+
+    def format(self) -> str:
+        total_ms = self.duration * 1e3
+        lines = [f"{self.name}  {total_ms:.2f}ms"]
+        for path, depth, count, total in self.breakdown():
+            name = path.rsplit("/", 1)[-1]
+            times = f" ×{count}" if count > 1 else ""
+            share = total / self.duration * 100 if self.duration else 0.0
+            lines.append(
+                f"{'  ' * depth}{name}{times}  {total * 1e3:.2f}ms  {share:.1f}%"
+            )
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "duration_ms": round(self.duration * 1e3, 3),
+            "spans": [
+                {"path": path, "count": count, "total_ms": round(total * 1e3, 3)}
+                for path, _, count, total in self.breakdown()
+            ],
+        }
+
+
+@dataclass(slots=True)
+class HistogramSnapshot:
+    """某个 span 名称的延迟分布；``buckets`` 的键为桶上界（毫秒）。"""
+
+    count: int
+    total_ms: float
+    max_ms: float
+    buckets: dict[float, int]
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """按桶估计分位数，返回所在桶的上界（最后一个桶返回最大值）。"""
+
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for bound, count in self.buckets.items():
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.mean_ms, 3),
+            "p50_ms": round(self.percentile(50), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": {
+                ("+Inf" if bound == float("inf") else f"{bound:g}"): count
+                for bound, count in self.buckets.items()
+                if count
+            },
+        }
+
+
+class _Histogram:
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self) -> None:
+        self.counts = [0] * len(BUCKET_BOUNDS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS_MS, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def snapshot(self) -> HistogramSnapshot:
+        return HistogramSnapshot(
+            self.count,
+            self.total_ms,
+            self.max_ms,
+            dict(zip(BUCKET_BOUNDS_MS, self.counts)),
+        )
+
+
+class _Span:
+    __slots__ = ("_tracer", "_name", "_record", "_spans", "_token", "_start")
+
+    def __init__(self, tracer: Tracer, name: str) -> None:
+        self._tracer = tracer
+        self._name = name
+        self._record: SpanRecord | None = None
+
+    def __enter__(self) -> _Span:
+        active = _ACTIVE.get()
+        if active is None:
+            self._spans: list[SpanRecord] = []
+            self._token = _ACTIVE.set((self._spans, self._name, 0))
+        else:
+            spans, parent, depth = active
+            self._record = SpanRecord(f"{parent}/{self._name}", depth + 1)
+            spans.append(self._record)
+            self._token = _ACTIVE.set((spans, self._record.path, depth + 1))
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        duration = time.perf_counter() - self._start
+        _ACTIVE.reset(self._token)
+        if self._record is not None:
+            self._record.duration = duration
+            self._tracer._observe(self._name, duration)
+        else:
+            self._tracer._finish(Trace(self._name, duration, self._spans))
+
+
+class Tracer:
+    """命名 span 的计时器，按 span 名称累积延迟直方图。
+
+    ``enabled`` 为 False 时不做任何记录。``slow_threshold_ms`` 大于 0 时，
+    最外层 span 超过阈值会以 WARNING 级别输出完整的分阶段明细。
+    """
+
+    def __init__(self, enabled: bool = False, slow_threshold_ms: float = 0.0) -> None:
+        self.enabled = enabled
+        self.slow_threshold_ms = slow_threshold_ms
+        self.last_trace: Trace | None = None
+        self._lock = threading.Lock()
+        self._histograms: dict[str, _Histogram] = {}
+
+    def span(self, name: str) -> ContextManager[Any]:
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def histograms(self) -> dict[str, HistogramSnapshot]:
+        with self._lock:
+            return {
+                name: histogram.snapshot()
+                for name, histogram in sorted(self._histograms.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+        self.last_trace = None
+
+    # ------------------------------------------------------------------ 内部方法
+    def _observe(self, name: str, duration: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = _Histogram()
+            histogram.observe(duration * 1e3)
+
+    def _finish(self, trace: Trace) -> None:
+        self._observe(trace.name, trace.duration)
+        self.last_trace = trace
+        if 0 < self.slow_threshold_ms <= trace.duration * 1e3:
+            LOGGER.warning(
+                "慢请求（阈值 %gms）:\n%s", self.slow_threshold_ms, trace.format()
+            )
+
+
+__all__ = ["HistogramSnapshot", "SpanRecord", "Trace", "Tracer"]
@@ -4,18 +4,26 @@ from __future__ import annotations
 
 from typing import Sequence
 
-from .data_models import RecommendationResult
+from .data_models import RecipeRecord, RecommendationResult
 
 
 def format_cli_block(result: RecommendationResult) -> str:
-    lines = ["=== GraphRAG 推荐结果 ===", f"参考菜谱: {result.reference_recipe.title}"]
-    if result.similar_recipes:
+    header = format_cli_header(result.reference_recipe, result.similar_recipes)
+    return f"{header}\n推荐理由: {result.explanation}"
+
+
+def format_cli_header(
+    reference: RecipeRecord, similar_recipes: Sequence[RecipeRecord]
+) -> str:
+    """推荐结果中不依赖 LLM 的部分，流式输出时先行打印。"""
+
+    lines = ["=== GraphRAG 推荐结果 ===", f"参考菜谱: {reference.title}"]
+    if similar_recipes:
         lines.append("相似菜谱:")
-        for recipe in result.similar_recipes:
+        for recipe in similar_recipes:
             lines.append(f"- {recipe.title} ({', '.join(recipe.tags) or '未标注'})")
     else:
         lines.append("未找到相似菜谱，可尝试更换关键词。")
-    lines.append(f"推荐理由: {result.explanation}")
     return "\n".join(lines)
 
 
@@ -31,4 +39,4 @@ def streamlit_render(
     ]
 
 
-__all__ = ["format_cli_block", "streamlit_render"]
+__all__ = ["format_cli_block", "format_cli_header", "streamlit_render"]
@@ -0,0 +1,94 @@
+"""LLMResponseCache 经由 LLMGenerator 注入本地桩客户端时的命中、过期与淘汰。"""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from graph_rag_recipes import llm_cache
+from graph_rag_recipes.config import ProjectConfig, ProjectPaths
+from graph_rag_recipes.data_models import RecipeRecord
+from graph_rag_recipes.llm_cache import LLMResponseCache
+from graph_rag_recipes.llm_generator import LLMGenerator
+
+REFERENCE = RecipeRecord("ref", "番茄炒蛋", ("番茄", "鸡蛋"), "炒匀即可。", ("家常",))
+CANDIDATES = [RecipeRecord("alt", "番茄蛋汤", ("番茄", "鸡蛋"), "煮沸即可。")]
+
+
+class StubClient:
+    """实现 ``responses.create`` 的桩，记录收到的 prompt。"""
+
+    def __init__(self) -> None:
+        self.prompts: list[str] = []
+        self.responses = SimpleNamespace(create=self._create)
+
+    def _create(self, model: str, input: str) -> Any:
+        self.prompts.append(input)
+        text = f"理由{len(self.prompts)}"
+        content = SimpleNamespace(text=text)
+        return SimpleNamespace(output=[SimpleNamespace(content=[content])])
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """替换缓存模块使用的时间源，按需手动推进。"""
+
+    now = [1_000_000.0]
+    monkeypatch.setattr(llm_cache, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def make_generator(
+    tmp_path: Any, **cache_options: Any
+) -> tuple[LLMGenerator, StubClient, LLMResponseCache]:
+    client = StubClient()
+    cache = LLMResponseCache(tmp_path / "llm_cache.sqlite3", **cache_options)
+    config = ProjectConfig(paths=ProjectPaths.from_project_root(tmp_path))
+    return LLMGenerator(config, client=client, cache=cache), client, cache
+
+
+def test_identical_call_is_served_from_cache(tmp_path, clock) -> None:
+    generator, client, cache = make_generator(tmp_path)
+
+    first = generator.generate(REFERENCE, CANDIDATES, "番茄")
+    second = generator.generate(REFERENCE, CANDIDATES, "番茄")
+
+    assert first == second == "理由1"
+    assert len(client.prompts) == 1
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.currsize) == (1, 1, 1)
+
+
+def test_expired_entry_reaches_client_again(tmp_path, clock) -> None:
+    generator, client, cache = make_generator(tmp_path, ttl_seconds=60)
+
+    generator.generate(REFERENCE, CANDIDATES, "番茄")
+    clock[0] += 30
+    assert generator.generate(REFERENCE, CANDIDATES, "番茄") == "理由1"
+    clock[0] += 61
+    assert generator.generate(REFERENCE, CANDIDATES, "番茄") == "理由2"
+
+    assert len(client.prompts) == 2
+    assert cache.stats().misses == 2
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, clock) -> None:
+    generator, client, cache = make_generator(tmp_path, max_entries=2)
+
+    for query in ("番茄", "鸡蛋"):
+        generator.generate(REFERENCE, CANDIDATES, query)
+        clock[0] += 1
+    # 再次访问“番茄”，使“鸡蛋”成为最久未访问的条目
+    generator.generate(REFERENCE, CANDIDATES, "番茄")
+    clock[0] += 1
+    generator.generate(REFERENCE, CANDIDATES, "青椒")
+    clock[0] += 1
+
+    assert len(cache) == 2
+    assert len(client.prompts) == 3
+    generator.generate(REFERENCE, CANDIDATES, "番茄")
+    assert len(client.prompts) == 3
+    generator.generate(REFERENCE, CANDIDATES, "鸡蛋")
+    assert len(client.prompts) == 4
@@ -0,0 +1,186 @@
+"""LLMGenerator.agenerate 对接本地 OpenAI 兼容桩服务的行为测试。"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("httpx")
+
+from graph_rag_recipes.config import ProjectConfig, ProjectPaths
+from graph_rag_recipes.data_models import RecipeRecord
+from graph_rag_recipes.llm_generator import LLMGenerator
+
+REFERENCE = RecipeRecord("ref", "番茄炒蛋", ("番茄", "鸡蛋"), "炒匀即可。", ("家常",))
+CANDIDATES = [RecipeRecord("alt", "番茄蛋汤", ("番茄", "鸡蛋"), "煮沸即可。")]
+
+
+class FakeResponsesServer(ThreadingHTTPServer):
+    """实现 ``POST /v1/responses`` 的最小桩，记录并发峰值并可注入延迟与失败。"""
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _FakeHandler)
+        self.delay = 0.0
+        self.failures = 0
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    server: FakeResponsesServer
+
+    def do_POST(self) -> None:
+        server = self.server
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        with server.lock:
+            server.requests += 1
+            attempt = server.requests
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            time.sleep(server.delay)
+        finally:
+            with server.lock:
+                server.active -= 1
+        if attempt <= server.failures:
+            self._reply(500, {"error": {"message": "boom", "type": "server_error"}})
+        else:
+            self._reply(200, _response_payload(f"理由{attempt}"))
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _reply(self, status: int, payload: dict[str, Any]) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端超时后已断开
+            pass
+
+
+def _response_payload(text: str) -> dict[str, Any]:
+    return {
+        "id": "resp_fake",
+        "object": "response",
+        "created_at": 0,
+        "model": "fake-model",
+        "status": "completed",
+        "parallel_tool_calls": False,
+        "tool_choice": "auto",
+        "tools": [],
+        "output": [
+            {
+                "type": "message",
+                "id": "msg_fake",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+        ],
+    }
+
+
+@pytest.fixture
+def server() -> Iterator[FakeResponsesServer]:
+    fake = FakeResponsesServer()
+    thread = threading.Thread(target=fake.serve_forever, daemon=True)
+    thread.start()
+    yield fake
+    fake.shutdown()
+    fake.server_close()
+
+
+def make_generator(
+    server: FakeResponsesServer, tmp_path: Any, monkeypatch: Any, **overrides: Any
+) -> LLMGenerator:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    settings = {
+        "llm_timeout": 5.0,
+        "llm_max_retries": 0,
+        "llm_retry_backoff": 0.01,
+        "llm_max_concurrency": 8,
+    } | overrides
+    config = ProjectConfig(
+        paths=ProjectPaths.from_project_root(tmp_path),
+        llm_base_url=server.base_url,
+        llm_cache_enabled=False,
+        **settings,
+    )
+    return LLMGenerator(config)
+
+
+async def generate_all(generator: LLMGenerator, queries: list[str]) -> list[str]:
+    try:
+        return await asyncio.gather(
+            *(generator.agenerate(REFERENCE, CANDIDATES, query) for query in queries)
+        )
+    finally:
+        await generator.aclose()
+
+
+def test_concurrency_is_bounded_by_semaphore(server, tmp_path, monkeypatch) -> None:
+    server.delay = 0.1
+    generator = make_generator(server, tmp_path, monkeypatch, llm_max_concurrency=2)
+
+    texts = asyncio.run(generate_all(generator, [f"查询{idx}" for idx in range(6)]))
+
+    assert server.requests == 6
+    assert server.max_active == 2
+    assert all(text.startswith("理由") for text in texts)
+
+
+def test_timeout_falls_back_to_template(server, tmp_path, monkeypatch) -> None:
+    server.delay = 1.0
+    generator = make_generator(server, tmp_path, monkeypatch, llm_timeout=0.2)
+
+    start = time.perf_counter()
+    [text] = asyncio.run(generate_all(generator, ["番茄"]))
+
+    assert time.perf_counter() - start < 1.0
+    assert generator.is_degraded(REFERENCE, CANDIDATES, text)
+
+
+def test_retries_server_error_then_succeeds(server, tmp_path, monkeypatch) -> None:
+    server.failures = 1
+    generator = make_generator(server, tmp_path, monkeypatch, llm_max_retries=2)
+
+    [text] = asyncio.run(generate_all(generator, ["番茄"]))
+
+    assert server.requests == 2
+    assert text == "理由2"
+
+
+def test_new_event_loop_closes_previous_client(server, tmp_path, monkeypatch) -> None:
+    generator = make_generator(server, tmp_path, monkeypatch)
+
+    async def generate_once() -> Any:
+        await generator.agenerate(REFERENCE, CANDIDATES, "番茄")
+        return generator._async_client
+
+    first = asyncio.run(generate_once())
+    second = asyncio.run(generate_once())
+
+    assert second is not first
+    assert first.is_closed()
+    asyncio.run(generator.aclose())